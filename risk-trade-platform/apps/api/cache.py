@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+
+from core.controls.sequencer import BOOK_LOCK_SCOPE
+
+# Versions are counted per process, so they only track every write when one
+# process does all the writing; off by default in cluster mode.
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "on" if BOOK_LOCK_SCOPE == "process" else "off")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class ResponseCache:
+    """
+    Serialized response bodies keyed by ETag (which encodes the versions
+    the body was built from), plus named generation counters for state
+    that has no version of its own (e.g. the audit log).
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, enabled: bool = True) -> None:
+        self.max_size = max_size
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+        self._generations: dict[str, int] = {}
+
+    def get(self, etag: str) -> bytes | None:
+        with self._lock:
+            body = self._bodies.get(etag)
+            if body is not None:
+                self._bodies.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._bodies[etag] = body
+            while len(self._bodies) > self.max_size:
+                self._bodies.popitem(last=False)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+    def generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+
+RESPONSES = ResponseCache(enabled=RESPONSE_CACHE == "on")
+
+
+def make_etag(name: str, *parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"{name}-{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def conditional_json(
+    request: Request,
+    etag: str,
+    build: Callable[[], Awaitable[Any]],
+    cache_control: str = "no-cache",
+) -> Response:
+    """
+    304 when the client already has `etag`, else the memoised body for it,
+    else builds, serialises and memoises the response. `etag` must change
+    whenever anything `build` reads changes.
+    """
+
+    if not RESPONSES.enabled:
+        return Response(content=json.dumps(await build()), media_type="application/json")
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = RESPONSES.get(etag)
+    if body is None:
+        body = json.dumps(await build()).encode()
+        RESPONSES.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
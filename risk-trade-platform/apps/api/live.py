@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Mapping
+
+from core.controls.limits import limit_utilization
+from core.risk.bond import BUCKETS
+from core.risk.positions import POSITIONS
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+LIVE_MAX_EVENTS = 50  # per pushed message; dashboards show the latest few
+
+# (book versions the message reflects, serialised message)
+LiveMessage = tuple[Mapping[str, int], str]
+
+
+class LiveHub:
+    """
+    Fan-out of live updates to connected dashboards (server-sent events).
+
+    Each message is serialised once and handed to every subscriber's queue,
+    so another open screen costs one queue put per update. A subscriber
+    that falls `queue_size` messages behind is cut off; its EventSource
+    reconnects and starts again from a fresh snapshot.
+
+    Messages carry the POSITIONS versions of the books they show, so a
+    subscriber can skip the ones its snapshot already covers.
+    """
+
+    def __init__(self, queue_size: int = LIVE_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[LiveMessage | None]] = set()
+
+    def publish(
+        self, kind: str, data: dict[str, Any], versions: Mapping[str, int] | None = None
+    ) -> None:
+        if not self._subscribers:
+            return
+        message = (versions or {}, format_sse(kind, data))
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)  # end of stream
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue[LiveMessage | None]]:
+        queue: asyncio.Queue[LiveMessage | None] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+def format_sse(kind: str, data: dict[str, Any]) -> str:
+    return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+def book_state(book: str) -> dict[str, Any]:
+    """
+    A book as the dashboard shows it, from the position cache (no DB read).
+    """
+
+    snapshot = POSITIONS.snapshot(book)
+    buckets = [snapshot["bucket_dv01"][b] for b in BUCKETS]
+    return {
+        "book": book,
+        "version": POSITIONS.version(book),
+        "trade_count": snapshot["trade_count"],
+        "book_notional": snapshot["book_notional"],
+        "book_dv01": snapshot["book_dv01"],
+        "bucket_dv01": snapshot["bucket_dv01"],
+        "utilization": limit_utilization(book, snapshot["book_dv01"], buckets),
+    }
+
+
+def publish_trade_updates(events: list[dict[str, Any]], books: Iterable[str]) -> None:
+    """
+    Called by the trade write path once its changes are committed: pushes
+    the new audit events and the touched books' DV01 / limit utilisation.
+    """
+
+    if not LIVE:
+        return
+    now = datetime.utcnow().isoformat()
+    for event in events:
+        event.setdefault("created_at", now)
+    states = [book_state(b) for b in sorted(set(books))]
+    LIVE.publish(
+        "update",
+        {
+            "events": events[-LIVE_MAX_EVENTS:],
+            "dropped_events": max(0, len(events) - LIVE_MAX_EVENTS),
+            "books": states,
+        },
+        versions={s["book"]: s["version"] for s in states},
+    )
+
+
+LIVE = LiveHub()
@@ -1,10 +1,20 @@
+import asyncio
 import time
 
 from fastapi import FastAPI
 from sqlalchemy.exc import OperationalError
 
+from core.controls.limits import LIMITS, LIMITS_POLL_INTERVAL_S
+from core.risk.positions import POSITIONS
+from core.risk.reference import REFERENCE, REFERENCE_POLL_INTERVAL_S
+from core.risk.scheduler import RISK_SCHEDULER
+from infra.db.audit import AUDIT
+from infra.db.idempotency import purge_loop
+from infra.db.migrate import upgrade_schema
 from infra.db.models import Base
-from infra.db.session import engine
+from infra.db.session import SessionLocal, async_engine, engine
+
+from apps.api.metrics import RouteLatencyMiddleware
 
 from apps.api.routes.trades import router as trades_router
 from apps.api.routes.risk import router as risk_router
@@ -15,11 +25,15 @@ from apps.api.routes.dashboard_api import router as dashboard_api_router
 from apps.api.routes.status_api import router as status_api_router
 from apps.api.routes.limits_api import router as limits_api_router
 from apps.api.routes.report_api import router as report_api_router
+from apps.api.routes.live_api import router as live_api_router
 
 from apps.api.routes.risk_runs_api import router as risk_runs_api_router
+from apps.api.routes.reference_api import router as reference_api_router
+from apps.api.routes.metrics_api import router as metrics_api_router
 
 # IMPORTANT: this variable must be named `app`
 app = FastAPI(title="Risk & Trade Platform", version="0.1.0")
+app.add_middleware(RouteLatencyMiddleware)
 
 # UI
 app.include_router(dashboard_page_router, tags=["dashboard"])
@@ -34,20 +48,68 @@ app.include_router(events_router, prefix="/events", tags=["events"])
 app.include_router(status_api_router, prefix="/api", tags=["dashboard"])
 app.include_router(limits_api_router, prefix="/api", tags=["dashboard"])
 app.include_router(report_api_router, prefix="/api", tags=["dashboard"])
+app.include_router(live_api_router, prefix="/api", tags=["dashboard"])
 
 # Risk run snapshot APIs
 app.include_router(risk_runs_api_router, tags=["risk-runs"])
 
+# Instrument reference data
+app.include_router(reference_api_router, prefix="/reference", tags=["reference"])
+
+# Prometheus scrape endpoint
+app.include_router(metrics_api_router, tags=["ops"])
+
 
 @app.on_event("startup")
 def on_startup() -> None:
     for _ in range(30):
         try:
             Base.metadata.create_all(bind=engine)
-            return
+            break
         except OperationalError:
             time.sleep(1)
-    raise RuntimeError("Database did not become ready in time.")
+    else:
+        raise RuntimeError("Database did not become ready in time.")
+
+    # create_all never alters existing tables: add columns / indexes added since
+    upgrade_schema(engine)
+
+    # Load instrument reference data, then warm the per-book position cache
+    # used by pre-trade checks
+    db = SessionLocal()
+    try:
+        REFERENCE.seed(db)
+        REFERENCE.load(db)
+        LIMITS.seed(db)
+        LIMITS.load(db)
+        POSITIONS.warm(db)
+    finally:
+        db.close()
+
+
+_background_tasks: list[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def start_background_tasks() -> None:
+    _background_tasks.append(asyncio.create_task(purge_loop()))
+    if REFERENCE_POLL_INTERVAL_S > 0:
+        _background_tasks.append(asyncio.create_task(REFERENCE.poll_loop()))
+    if LIMITS_POLL_INTERVAL_S > 0:
+        _background_tasks.append(asyncio.create_task(LIMITS.poll_loop()))
+    await AUDIT.recover()
+    AUDIT.start()
+    RISK_SCHEDULER.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    await RISK_SCHEDULER.stop()
+    await AUDIT.stop()
+    await async_engine.dispose()
 
 
 @app.get("/health")
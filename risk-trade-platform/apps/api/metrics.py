@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infra.metrics import HTTP_REQUEST_SECONDS
+
+
+class RouteLatencyMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering): records
+    the time to the response headers per method / route template / status.
+    Long-lived streams (/api/stream) are timed to their first byte.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start,
+                    scope["method"],
+                    route_template(scope),
+                    str(message["status"]),
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    The matched route's path template, e.g. /risk-runs/{run_id}; templates
+    (not raw paths) keep the label set bounded.
+    """
+
+    # the router has set the matched route on the scope by now
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+
+    # newer FastAPI sets the route as declared on its APIRouter, without the
+    # include_router prefix (/summary for /api/summary): put the prefix back
+    path = scope["path"]
+    for i, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[i:]):
+            return path[:i] + route.path
+    return route.path
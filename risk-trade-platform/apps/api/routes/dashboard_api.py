@@ -1,48 +1,62 @@
 from __future__ import annotations
 
-import json
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.risk.aggregate import portfolio_dv01
-from infra.db.models import Event, Trade
-from infra.db.session import SessionLocal
+from apps.api.cache import RESPONSES, conditional_json, make_etag
+from core.risk.aggregate import positions_dv01
+from core.risk.book import book_positions_async
+from core.risk.positions import POSITIONS
+from core.risk.reference import REFERENCE
+from infra.db.models import Event
+from infra.db.session import get_async_db
 
 router = APIRouter()
 
 
-def get_db() -> Session:
-    return SessionLocal()
-
-
 @router.get("/summary")
-def dashboard_summary() -> dict[str, Any]:
-    db = get_db()
+async def dashboard_summary(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    # unchanged books, audit log and reference data: same body (or a 304)
+    etag = make_etag(
+        "summary",
+        POSITIONS.versions(),
+        RESPONSES.generation("events"),
+        REFERENCE.current.version,
+        datetime.utcnow().date(),
+    )
+    return await conditional_json(request, etag, lambda: _summary(db))
 
-    trades = db.query(Trade).all()
-    trade_dicts = [{"symbol": t.symbol, "quantity": t.quantity, "price": t.price} for t in trades]
+
+async def _summary(db: AsyncSession) -> dict[str, Any]:
+    positions = await book_positions_async(db)
 
     risk = {"message": "No trades available"}
-    if trade_dicts:
-        risk = portfolio_dv01(trade_dicts)
+    if positions:
+        risk = positions_dv01(positions)
 
     events = (
-        db.query(Event)
-        .order_by(Event.created_at.desc())
-        .limit(10)
-        .all()
-    )
+        await db.scalars(
+            select(Event)
+            .order_by(Event.created_at.desc(), Event.id.desc())
+            .limit(10)
+        )
+    ).all()
 
     return {
-        "trade_count": len(trades),
+        "trade_count": sum(p[2] for p in positions),
         "risk": risk,
         "latest_events": [
             {
                 "id": e.id,
                 "event_type": e.event_type,
-                "payload": json.loads(e.payload),
+                "payload": e.payload,
                 "created_at": e.created_at.isoformat(),
             }
             for e in events
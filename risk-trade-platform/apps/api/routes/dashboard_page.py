@@ -255,6 +255,7 @@ def home() -> str:
         <button class="btn primary" id="refreshBtn">Refresh</button>
         <a class="btn" href="/docs" target="_blank">API Docs</a>
         <a class="btn" href="/api/report">Download Report</a>
+        <a class="btn" href="/api/report/stream?format=csv">Export CSV</a>
         <button class="btn" id="helpBtn">Help</button>
       </div>
     </div>
@@ -351,7 +352,7 @@ def home() -> str:
         <div class="card">
           <div class="hd">
             <h2>Portfolio snapshot</h2>
-            <div class="help" data-tip="Metrics come from /api/summary which reads trades from Postgres and computes DV01 using the risk engine.">?</div>
+            <div class="help" data-tip="Live: pushed over /api/stream from the trade write path (book DV01 and limit utilisation per book).">?</div>
           </div>
           <div class="bd">
             <div class="kpis">
@@ -368,6 +369,7 @@ def home() -> str:
                 <div id="dv01" class="value">—</div>
               </div>
             </div>
+            <div id="utilBox" class="muted" style="margin-top:10px;font-size:12px;"></div>
           </div>
         </div>
 
@@ -539,11 +541,54 @@ def home() -> str:
     toast("bad", "Risk run failed", JSON.stringify(data, null, 2));
   }
 
+  // Live state, fed by /api/stream (server push) instead of polling /api/summary
+  const live = { connected: false, books: {}, events: [] };
+
+  function renderBooks(){
+    const books = Object.values(live.books);
+    const sum = (k) => books.reduce((acc, b) => acc + (b[k] || 0), 0);
+    $("tradeCount").textContent = sum("trade_count");
+    $("notional").textContent = books.length ? fmtMoney(sum("book_notional")) : "—";
+    $("dv01").textContent = books.length ? (fmtMoney(sum("book_dv01")) + "/bp") : "—";
+
+    $("utilBox").innerHTML = books.map(b => {
+      const u = Object.entries(b.utilization || {});
+      if (!u.length) return "";
+      const [metric, worst] = u.sort((x, y) => y[1] - x[1])[0];
+      const cls = worst >= 1 ? "bad" : worst >= 0.8 ? "warn" : "good";
+      return `<span class="pill ${cls}">${b.book}: ${(worst * 100).toFixed(0)}% of ${metric}</span>`;
+    }).join(" ");
+  }
+
+  function applyLive(data){
+    (data.books || []).forEach(b => { live.books[b.book] = b; });
+    // newest first, keep the latest 10
+    live.events = (data.events || []).slice().reverse().concat(live.events).slice(0, 10);
+    renderBooks();
+    renderEvents(live.events);
+  }
+
+  function connectLive(){
+    if (!window.EventSource) return false;
+    const es = new EventSource("/api/stream");
+    es.addEventListener("snapshot", (e) => {
+      live.connected = true;
+      live.books = {};
+      live.events = [];
+      applyLive(JSON.parse(e.data));
+    });
+    es.addEventListener("update", (e) => applyLive(JSON.parse(e.data)));
+    es.onerror = () => { live.connected = false; };  // EventSource retries on its own
+    return true;
+  }
+
   async function refresh(){
     await loadStatus();
     await loadLimits();
     await loadRuns();
+    if (live.connected) return;
 
+    // fallback when the live stream is unavailable
     const res = await fetch("/api/summary");
     const data = await res.json();
 
@@ -553,9 +598,12 @@ def home() -> str:
     $("notional").textContent = risk.portfolio_notional ? fmtMoney(risk.portfolio_notional) : "—";
     $("dv01").textContent = risk.portfolio_dv01 ? (fmtMoney(risk.portfolio_dv01) + "/bp") : "—";
 
+    renderEvents(data.latest_events || []);
+  }
+
+  function renderEvents(events){
     const tbody = $("eventsBody");
     tbody.innerHTML = "";
-    const events = data.latest_events || [];
     if (events.length === 0){
       tbody.innerHTML = `<tr><td class="muted">No events yet</td><td></td><td></td></tr>`;
       return;
@@ -601,7 +649,7 @@ def home() -> str:
       toast("good", "Trade accepted",
         `Status: ${j.status}\nDV01 before: ${j.book_dv01_before}\nDV01 after: ${j.book_dv01_after}\nTrade ID: ${j.trade_id}`
       );
-      await refresh();
+      if (!live.connected) await refresh();
       return;
     }
 
@@ -611,7 +659,7 @@ def home() -> str:
       toast("bad", "Trade blocked",
         `Reasons: ${(d.reasons || []).join(", ")}\nDV01 before: ${d.book_dv01_before}\nDV01 after: ${d.book_dv01_after}`
       );
-      await refresh();
+      if (!live.connected) await refresh();
       return;
     }
 
@@ -644,6 +692,7 @@ def home() -> str:
   $("refreshBtn").onclick = refresh;
   $("runRiskBtn").onclick = runRisk;
 
+  connectLive();
   refresh();
 </script>
 </body>
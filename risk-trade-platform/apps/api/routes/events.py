@@ -1,42 +1,116 @@
 from __future__ import annotations
 
+import base64
 import json
-from typing import Any
+from datetime import datetime, timezone
 
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import String, Text, cast, select, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from infra.db.models import Event
-from infra.db.session import SessionLocal
+from infra.db.session import get_async_db
 
 router = APIRouter()
 
 
-def get_db() -> Session:
-    return SessionLocal()
+def encode_cursor(created_at: datetime, event_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
 
 
 @router.get("/")
-def list_events(limit: int = 50) -> list[dict[str, Any]]:
+async def list_events(
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    event_type: str | None = None,
+    book: str | None = None,
+    symbol: str | None = None,
+    status: str | None = None,
+    reason: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
     """
-    Returns most recent events (audit trail).
+    Returns most recent events (audit trail), newest first.
+
+    Keyset-paginated on (created_at, id): pass the X-Next-Cursor header of
+    one page as `cursor` to get the next. Every page is an index range scan,
+    however deep. `reason` matches events carrying that reason code.
+    `since` / `until` without a zone are UTC.
     """
 
-    db = get_db()
+    stmt = select(
+        Event.id,
+        Event.event_type,
+        Event.book,
+        Event.symbol,
+        Event.decision_status,
+        Event.created_at,
+        cast(Event.payload, Text).label("payload"),
+    )
+    if event_type:
+        stmt = stmt.where(Event.event_type == event_type)
+    if book:
+        stmt = stmt.where(Event.book == book)
+    if symbol:
+        stmt = stmt.where(Event.symbol == symbol)
+    if status:
+        stmt = stmt.where(Event.decision_status == status)
+    if reason:
+        if db.bind.dialect.name == "postgresql":
+            # jsonb @> '["CODE"]', served by the GIN index
+            stmt = stmt.where(type_coerce(Event.reason_codes, JSONB).contains([reason]))
+        else:
+            stmt = stmt.where(cast(Event.reason_codes, String).like(f'%"{reason}"%'))
+    if since:
+        stmt = stmt.where(Event.created_at >= _naive_utc(since))
+    if until:
+        stmt = stmt.where(Event.created_at < _naive_utc(until))
+    if cursor:
+        stmt = stmt.where(tuple_(Event.created_at, Event.id) < tuple_(*decode_cursor(cursor)))
 
     events = (
-        db.query(Event)
-        .order_by(Event.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+        await db.execute(
+            stmt.order_by(Event.created_at.desc(), Event.id.desc()).limit(limit)
+        )
+    ).all()
+
+    headers = {}
+    if len(events) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(events[-1].created_at, events[-1].id)
 
-    return [
+    # payloads are spliced in as the JSON text the DB returns: no decode/re-encode
+    body = "[" + ",".join(_event_json(e) for e in events) + "]"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    # created_at is stored as naive UTC
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _event_json(e) -> str:
+    meta = json.dumps(
         {
             "id": e.id,
             "event_type": e.event_type,
-            "payload": json.loads(e.payload),
+            "book": e.book,
+            "symbol": e.symbol,
+            "decision_status": e.decision_status,
             "created_at": e.created_at.isoformat(),
         }
-        for e in events
-    ]
+    )
+    return meta[:-1] + ', "payload": ' + e.payload + "}"
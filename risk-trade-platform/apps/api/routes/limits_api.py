@@ -1,12 +1,57 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.controls.limits import BOOK_LIMITS
+from apps.api.cache import conditional_json, make_etag
+from core.controls.limits import LIMITS
+from infra.db.session import get_async_db
 
 router = APIRouter()
 
 
+class LimitRequest(BaseModel):
+    level: str  # FIRM | DESK | BOOK | SYMBOL
+    metric: str
+    desk: str | None = None
+    book: str | None = None
+    symbol: str | None = None
+    warn: float | None = None  # both unset: remove the limit
+    block: float | None = None
+
+
 @router.get("/limits")
-def limits() -> dict:
-    return BOOK_LIMITS
+async def limits(request: Request) -> Response:
+    # compiled per-book rule tables at the current version
+    limit_set = LIMITS.current
+
+    async def build() -> dict:
+        return limit_set.to_dict()
+
+    return await conditional_json(request, make_etag("limits", limit_set.version), build)
+
+
+@router.put("/limits")
+async def set_limits(
+    rules: list[LimitRequest] = Body(default=[]),
+    desks: dict[str, str] = Body(default={}),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Sets limits and book -> desk mappings and bumps the limits version.
+    """
+
+    try:
+        limit_set = await LIMITS.upsert(db, [r.model_dump() for r in rules], desks)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"version": limit_set.version, "rule_count": len(limit_set.scoped)}
+
+
+@router.post("/limits/reload")
+async def reload_limits(db: AsyncSession = Depends(get_async_db)) -> dict:
+    before = LIMITS.current.version
+    limit_set = await LIMITS.load_async(db)
+    return {"previous_version": before, "version": limit_set.version}
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from apps.api.live import LIVE, book_state, format_sse
+from core.risk.positions import POSITIONS
+from infra.db.models import Event
+from infra.db.session import AsyncSessionLocal
+
+KEEPALIVE_S = 15.0
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def live_stream() -> StreamingResponse:
+    """
+    Server-sent events for the dashboard: one `snapshot` (every cached book
+    plus the latest audit events), then an `update` whenever a trade is
+    evaluated. Updates come from the trade write path, not from polling.
+    """
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _snapshot() -> dict[str, Any]:
+    # books before events: a trade is committed before it reaches the cache,
+    # so the events of every book version seen here are already readable
+    books = [book_state(b) for b in POSITIONS.books()]
+
+    # session only for the snapshot: a Depends session would hold a pooled
+    # connection for as long as the dashboard stays open
+    async with AsyncSessionLocal() as db:
+        events = (
+            await db.scalars(
+                select(Event).order_by(Event.created_at.desc(), Event.id.desc()).limit(10)
+            )
+        ).all()
+    return {
+        "books": books,
+        "events": [
+            {
+                "id": e.id,
+                "event_type": e.event_type,
+                "book": e.book,
+                "payload": e.payload,
+                "created_at": e.created_at.isoformat(),
+            }
+            for e in reversed(events)  # oldest first, same order as updates
+        ],
+    }
+
+
+async def _stream() -> AsyncIterator[str]:
+    # subscribed before the snapshot is read, so no update published while
+    # it is built is lost; updates it already covers are skipped below
+    with LIVE.subscribe() as queue:
+        snapshot = await _snapshot()
+        seen = {b["book"]: b["version"] for b in snapshot["books"]}
+        yield format_sse("snapshot", snapshot)
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:  # fell too far behind; the client reconnects
+                return
+            versions, message = item
+            if versions and all(v <= seen.get(book, 0) for book, v in versions.items()):
+                continue
+            yield message
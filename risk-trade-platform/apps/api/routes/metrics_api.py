@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from infra.metrics import REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    # Prometheus text format for this worker process
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Body, Depends
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.risk.reference import REFERENCE
+from infra.db.session import get_async_db
+
+router = APIRouter()
+
+
+class InstrumentRequest(BaseModel):
+    symbol: str
+    modified_duration: float = Field(gt=0)
+    # optional bond terms, needed for curve pricing
+    coupon: float | None = None
+    maturity: date | None = None
+    frequency: int = Field(default=2, ge=1, le=12)
+
+
+class CurvePointRequest(BaseModel):
+    tenor_years: float = Field(gt=0)
+    zero_rate: float
+
+
+@router.get("/instruments")
+def list_instruments() -> dict:
+    index = REFERENCE.current
+    instruments = []
+    for symbol, duration in sorted(index.durations.items()):
+        terms = index.terms.get(symbol)
+        instruments.append(
+            {
+                "symbol": symbol,
+                "modified_duration": duration,
+                "coupon": terms.coupon if terms else None,
+                "maturity": terms.maturity.isoformat() if terms else None,
+                "frequency": terms.frequency if terms else None,
+            }
+        )
+    return {"version": index.version, "instruments": instruments}
+
+
+@router.get("/curve")
+def get_curve() -> dict:
+    index = REFERENCE.current
+    curve = index.curve
+    points = [] if curve is None else list(zip(curve.tenors.tolist(), curve.rates.tolist()))
+    return {
+        "version": index.version,
+        "points": [{"tenor_years": t, "zero_rate": r} for t, r in points],
+    }
+
+
+@router.put("/instruments")
+async def upsert_instruments(
+    instruments: list[InstrumentRequest],
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Adds or updates instruments and bumps the reference version.
+    """
+
+    index = await REFERENCE.upsert(db, instruments=[i.model_dump() for i in instruments])
+    return {"version": index.version, "instrument_count": len(index.durations)}
+
+
+@router.put("/curve")
+async def replace_curve(
+    points: list[CurvePointRequest] = Body(min_length=2),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Replaces the zero curve used by curve-priced books (new reference version).
+    """
+
+    index = await REFERENCE.upsert(db, curve={p.tenor_years: p.zero_rate for p in points})
+    return {"version": index.version, "curve_points": len(points)}
+
+
+@router.post("/reload")
+async def reload_reference(db: AsyncSession = Depends(get_async_db)) -> dict:
+    """
+    Picks up a newer reference version now instead of on the next poll
+    (direct edits to the instruments table must bump reference_versions).
+    """
+
+    before = REFERENCE.current.version
+    index = await REFERENCE.load_async(db)
+    return {
+        "previous_version": before,
+        "version": index.version,
+        "instrument_count": len(index.durations),
+    }
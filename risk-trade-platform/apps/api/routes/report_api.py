@@ -1,34 +1,50 @@
 from __future__ import annotations
 
+import csv
+import io
 import json
 from datetime import datetime
+from typing import AsyncIterator, Literal
 
-from fastapi import APIRouter
-from fastapi.responses import Response
+import numpy as np
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from core.risk.aggregate import portfolio_dv01
+from core.risk.aggregate import positions_dv01
+from core.risk.book import book_positions
+from core.risk.bond import pricing_method
+from core.risk.columnar import (
+    blend_curve_dv01,
+    columnar_dv01,
+    curve_dv01_table,
+    duration_table,
+    encode_symbols,
+)
+from core.risk.reference import REFERENCE
 from infra.db.models import Trade
-from infra.db.session import SessionLocal
+from infra.db.session import AsyncSessionLocal, get_db
 
-router = APIRouter()
+# rows fetched from the server-side cursor (and priced) per chunk
+EXPORT_CHUNK_SIZE = 5_000
 
+CSV_COLUMNS = ["trade_id", "book", "symbol", "quantity", "price", "notional", "dv01", "created_at"]
+# CSV only: the error of an unpriced row, and the counts filled in on the TOTAL row
+CSV_EXTRA_COLUMNS = ["error", "trade_count", "error_count", "reference_version"]
 
-def get_db() -> Session:
-    return SessionLocal()
+router = APIRouter()
 
 
 @router.get("/report")
-def report() -> Response:
-    db = get_db()
-    trades = db.query(Trade).all()
+def report(db: Session = Depends(get_db)) -> Response:
+    positions = book_positions(db)
 
-    trade_dicts = [{"symbol": t.symbol, "quantity": t.quantity, "price": t.price} for t in trades]
-    risk = {"message": "No trades available"} if not trade_dicts else portfolio_dv01(trade_dicts)
+    risk = {"message": "No trades available"} if not positions else positions_dv01(positions)
 
     payload = {
         "generated_at": datetime.utcnow().isoformat() + "Z",
-        "trade_count": len(trades),
+        "trade_count": sum(p[2] for p in positions),
         "risk": risk,
     }
 
@@ -40,3 +56,156 @@ def report() -> Response:
         media_type="application/json",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
+
+
+@router.get("/report/stream")
+async def report_stream(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    book: str | None = None,
+) -> StreamingResponse:
+    """
+    Streams per-trade risk lines, then a totals line, for every trade (or one
+    book). Trades are read in chunks from a server-side cursor and priced a
+    chunk at a time, so memory stays flat regardless of book size.
+
+    A trade whose symbol cannot be priced (no duration configured) cannot
+    fail the response once streaming has started: it becomes an "error"
+    line (NDJSON) or a row with an empty dv01 and an `error` (CSV), and is
+    left out of the totals, which count such trades in `error_count`. Both
+    formats end with the same totals (CSV: the TOTAL row).
+    """
+
+    generated_at = datetime.utcnow()
+    filename = f"risk_report_{generated_at.strftime('%Y%m%d_%H%M%S')}.{format}"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+
+    return StreamingResponse(
+        _export_lines(format, book, generated_at),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _export_lines(
+    format: str,
+    book: str | None,
+    generated_at: datetime,
+) -> AsyncIterator[str]:
+    # no ORDER BY: rows flow straight off the scan instead of waiting for a sort
+    stmt = select(
+        Trade.id, Trade.book, Trade.symbol, Trade.quantity, Trade.price, Trade.created_at
+    )
+    if book is not None:
+        stmt = stmt.where(Trade.book == book)
+
+    if format == "csv":
+        yield ",".join(CSV_COLUMNS + CSV_EXTRA_COLUMNS) + "\n"
+
+    # one reference version for the whole export, even if it is swapped mid-stream
+    index = REFERENCE.current
+    trade_count = 0
+    error_count = 0
+    total_notional = 0.0
+    total_dv01 = 0.0
+
+    # the session lives inside the generator: it must outlast the route call
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            ids, books, symbols, quantities, prices, created = zip(*rows)
+
+            distinct, codes = encode_symbols(symbols)
+            qty = np.asarray(quantities, dtype=np.float64)
+            notional, dv01 = columnar_dv01(
+                codes,
+                qty,
+                np.asarray(prices, dtype=np.float64),
+                duration_table(distinct, index),
+            )
+
+            # rows in curve-priced books: bump-and-reprice DV01 instead
+            book_names, book_codes = encode_symbols(books)
+            curve_books = np.array([pricing_method(b) == "curve" for b in book_names])
+            if curve_books.any():
+                dv01 = blend_curve_dv01(
+                    codes, qty, dv01, curve_dv01_table(distinct, index), curve_books[book_codes]
+                )
+
+            priced = ~np.isnan(dv01)
+            errors = len(ids) - int(priced.sum())
+            trade_count += len(ids) - errors
+            error_count += errors
+            total_notional += float(notional[priced].sum())
+            total_dv01 += float(dv01[priced].sum())
+
+            dv01_cells = dv01.tolist() if not errors else np.where(priced, dv01, None).tolist()
+            lines = zip(
+                ids, books, symbols, quantities, prices, notional.tolist(), dv01_cells, created
+            )
+            if format == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf, lineterminator="\n")
+                writer.writerows(
+                    (
+                        *line[:7],
+                        line[7].isoformat(),
+                        "" if line[6] is not None else _error(line[2]),
+                        "",
+                        "",
+                        "",
+                    )
+                    for line in lines
+                )
+                yield buf.getvalue()
+            else:
+                yield "".join(_ndjson_line(line) for line in lines)
+
+    totals = {
+        "generated_at": generated_at.isoformat() + "Z",
+        "book": book,
+        "trade_count": trade_count,
+        "error_count": error_count,
+        "portfolio_notional": total_notional,
+        "portfolio_dv01": total_dv01,
+        "reference_version": index.version,
+    }
+    if format == "csv":
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerow(
+            [
+                "TOTAL",
+                book or "",
+                "",
+                "",
+                "",
+                total_notional,
+                total_dv01,
+                totals["generated_at"],
+                "",
+                trade_count,
+                error_count,
+                index.version,
+            ]
+        )
+        yield buf.getvalue()
+    else:
+        yield json.dumps({"type": "totals", **totals}) + "\n"
+
+
+def _ndjson_line(line: tuple) -> str:
+    row = dict(zip(CSV_COLUMNS, (*line[:7], line[7].isoformat())))
+    if row["dv01"] is None:
+        return json.dumps(
+            {
+                "type": "error",
+                "trade_id": row["trade_id"],
+                "book": row["book"],
+                "symbol": row["symbol"],
+                "error": _error(row["symbol"]),
+            }
+        ) + "\n"
+    return json.dumps({"type": "trade", **row}, allow_nan=False) + "\n"
+
+
+def _error(symbol: str) -> str:
+    return f"No duration configured for {symbol}"
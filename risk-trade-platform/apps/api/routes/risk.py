@@ -1,27 +1,76 @@
-from fastapi import APIRouter
-from infra.db.session import SessionLocal
-from infra.db.models import Trade
-from core.risk.aggregate import portfolio_dv01
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.cache import conditional_json, make_etag
+from infra.db.session import get_async_db
+from core.controls.sequencer import SEQUENCER
+from core.risk.aggregate import positions_dv01
+from core.risk.book import book_positions_async
+from core.risk.positions import POSITIONS
+from core.risk.reference import REFERENCE
+from core.risk.runs import build_report, positions_as_of
 
 router = APIRouter()
 
 
 @router.get("/summary")
-def risk_summary() -> dict:
-    db = SessionLocal()
+async def risk_summary(request: Request, db: AsyncSession = Depends(get_async_db)) -> Response:
+    etag = make_etag(
+        "risk", POSITIONS.versions(), REFERENCE.current.version, datetime.utcnow().date()
+    )
+    return await conditional_json(request, etag, lambda: _risk_summary(db))
 
-    trades = db.query(Trade).all()
 
-    trade_dicts = [
-        {
-            "symbol": t.symbol,
-            "quantity": t.quantity,
-            "price": t.price,
-        }
-        for t in trades
-    ]
+async def _risk_summary(db: AsyncSession) -> dict:
+    # one row per (book, symbol), summed in the database
+    positions = await book_positions_async(db)
 
-    if not trade_dicts:
+    if not positions:
         return {"message": "No trades available"}
 
-    return portfolio_dv01(trade_dicts)
+    return positions_dv01(positions)
+
+
+@router.get("/as-of")
+async def risk_as_of(
+    ts: datetime,
+    book: str = "RATES",
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Book risk as it stood at `ts`, rebuilt from the nearest earlier risk run
+    plus the trades booked after it (timestamps without a zone are UTC).
+    """
+
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+    positions, base = await positions_as_of(db, book, ts)
+
+    report = build_report(book, positions, ts)
+    report["as_of"] = report.pop("generated_at")
+    report["base_run_id"] = base.id if base is not None else None
+    return report
+
+
+@router.get("/positions")
+def book_positions(book: str = "RATES") -> dict:
+    return POSITIONS.snapshot(book)
+
+
+@router.post("/positions/verify")
+async def verify_positions(
+    book: str = "RATES",
+    repair: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Consistency check of the cached book position against a full recompute.
+    """
+
+    # under the book's lock, so a repair cannot overwrite a trade that is
+    # committed but not yet applied to the cache
+    async with SEQUENCER.book(db, book):
+        return await db.run_sync(lambda session: POSITIONS.verify(session, book, repair=repair))
@@ -1,56 +1,55 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
-
-from core.risk.aggregate import portfolio_dv01
-from infra.db.models import RiskRun, Trade
-from infra.db.session import SessionLocal
+from apps.api.cache import IMMUTABLE, make_etag, not_modified
+from core.risk.runs import create_risk_run
+from core.risk.scheduler import RISK_SCHEDULER
+from infra.db.models import RiskRun
+from infra.db.session import get_async_db
 
 router = APIRouter()
 
 
-def get_db() -> Session:
-    return SessionLocal()
-
-
+@router.post("/risk-runs")
 @router.post("/risk-runs/run")
-def run_risk(book: str = "RATES") -> dict:
-    db = get_db()
-
-    trades = db.query(Trade).filter(Trade.book == book).all()
-    trade_dicts = [{"symbol": t.symbol, "quantity": t.quantity, "price": t.price} for t in trades]
-
-    risk = {"message": "No trades available"} if not trade_dicts else portfolio_dv01(trade_dicts)
-
-    payload = {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
+async def run_risk(
+    book: str = "RATES",
+    full: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """
+    Snapshot built from the previous run plus trades booked since it;
+    `full=true` recomputes the book from scratch.
+    """
+
+    run = await create_risk_run(db, book, full=full)
+
+    return {
+        "run_id": run.id,
         "book": book,
-        "trade_count": len(trades),
-        "risk": risk,
+        "generated_at": run.created_at.isoformat() + "Z",
+        "base_run_id": run.base_run_id,
+        "high_water_mark": run.high_water_mark.isoformat() if run.high_water_mark else None,
     }
 
-    run = RiskRun(book=book, report=json.dumps(payload))
-    db.add(run)
-    db.commit()
-
-    return {"run_id": run.id, "book": book, "generated_at": payload["generated_at"]}
-
 
 @router.get("/risk-runs")
-def list_runs(book: str = "RATES", limit: int = 5) -> list[dict]:
-    db = get_db()
-
+async def list_runs(
+    book: str = "RATES",
+    limit: int = 5,
+    db: AsyncSession = Depends(get_async_db),
+) -> list[dict]:
     runs = (
-        db.query(RiskRun)
-        .filter(RiskRun.book == book)
-        .order_by(RiskRun.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            select(RiskRun)
+            .where(RiskRun.book == book)
+            .order_by(RiskRun.created_at.desc())
+            .limit(limit)
+        )
+    ).all()
 
     return [
         {"run_id": r.id, "book": r.book, "created_at": r.created_at.isoformat()}
@@ -58,12 +57,54 @@ def list_runs(book: str = "RATES", limit: int = 5) -> list[dict]:
     ]
 
 
-@router.get("/risk-runs/{run_id}")
-def get_run(run_id: str) -> dict:
-    db = get_db()
+@router.post("/risk-runs/jobs", status_code=202)
+async def submit_jobs(book: str | None = None, full: bool = False) -> list[dict]:
+    """
+    Queues background risk runs: one for `book`, or one per book when omitted
+    (end of day). Returns immediately; poll GET /risk-runs/jobs/{job_id}.
+    """
+
+    if book:
+        jobs = [RISK_SCHEDULER.submit(book, full=full)]
+    else:
+        jobs = await RISK_SCHEDULER.submit_all(full=full)
+    return [j.to_dict() for j in jobs]
+
+
+@router.get("/risk-runs/jobs")
+def list_jobs(book: str | None = None, limit: int = 50) -> dict:
+    return {
+        "schedule": RISK_SCHEDULER.schedule,
+        "jobs": [j.to_dict() for j in RISK_SCHEDULER.jobs(book, limit)],
+    }
 
-    run = db.query(RiskRun).filter(RiskRun.id == run_id).first()
-    if not run:
-        return {"error": "run not found"}
 
-    return json.loads(run.report)
+@router.get("/risk-runs/jobs/{job_id}")
+def get_job(job_id: str) -> dict:
+    job = RISK_SCHEDULER.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
+
+
+@router.get("/risk-runs/{run_id}")
+async def get_run(
+    request: Request,
+    run_id: str,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    run = await db.get(RiskRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="run not found")
+
+    # a run's report never changes once written: the id is the ETag
+    etag = make_etag("run", run_id)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMMUTABLE})
+
+    # stored report is already JSON
+    return Response(
+        content=run.report,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": IMMUTABLE},
+    )
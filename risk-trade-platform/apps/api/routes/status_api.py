@@ -1,16 +1,27 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Depends
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 
-from infra.db.session import SessionLocal
+from infra.db.session import get_db, pool_status
 
 router = APIRouter()
 
 
 @router.get("/status")
-def status() -> dict[str, str]:
+def status(db: Session = Depends(get_db)) -> dict[str, str]:
     # basic DB ping
-    db = SessionLocal()
     db.execute(text("SELECT 1"))
     return {"api": "ok", "db": "ok"}
+
+
+@router.get("/status/pool")
+def status_pool() -> dict[str, Any]:
+    """
+    Connection pool occupancy and checkout wait times for this worker.
+    """
+
+    return pool_status()
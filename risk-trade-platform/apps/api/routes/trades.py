@@ -1,17 +1,28 @@
 from __future__ import annotations
 
 import json
+import time
 from typing import Any
 
-from fastapi import APIRouter, Header, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.controls.limits import evaluate_limits
-from core.risk.book import current_book_dv01
+from apps.api.cache import RESPONSES
+from apps.api.live import publish_trade_updates
+from core.controls.limits import LIMITS, evaluate_limits, limit_headroom
+from core.controls.sequencer import SEQUENCER
+from core.risk.positions import POSITIONS
+from core.risk.bond import BUCKETS
 from core.risk.dv01 import calculate_bond_dv01
-from infra.db.models import Event, IdempotencyRecord, Trade
-from infra.db.session import SessionLocal
+from core.risk.reference import REFERENCE
+from infra.db.audit import AUDIT
+from infra.db.idempotency import lookup_response, remember_response
+from infra.db.models import IdempotencyRecord, Trade
+from infra.db.session import get_async_db
+from infra.metrics import TRADE_DECISIONS, TRADE_REASONS, TRADE_STAGE_SECONDS
 
 router = APIRouter()
 
@@ -23,39 +34,63 @@ class TradeRequest(BaseModel):
     book: str
 
 
-def get_db() -> Session:
-    return SessionLocal()
+class BatchTradeRequest(BaseModel):
+    trades: list[TradeRequest] = Field(min_length=1, max_length=1000)
+
+
+class WhatIfRequest(BaseModel):
+    trades: list[TradeRequest] = Field(min_length=1, max_length=10_000)
 
 
 @router.post("/")
-def create_trade(
+async def create_trade(
     trade: TradeRequest,
     idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict[str, Any]:
-    db = get_db()
+    # Each numbered stage is timed into trade_stage_duration_seconds (/metrics)
+
+    # 0) Idempotency check (in-memory cache first, then the DB)
+    if idempotency_key:
+        with TRADE_STAGE_SECONDS.time("idempotency"):
+            existing = await lookup_response(db, idempotency_key)
+        if existing is not None:
+            return existing
+
+    # 1) Compute risk for THIS trade
     try:
-        # 0) Idempotency check
-        if idempotency_key:
-            existing = db.query(IdempotencyRecord).filter_by(key=idempotency_key).first()
-            if existing:
-                return json.loads(existing.response)
+        with TRADE_STAGE_SECONDS.time("dv01"):
+            risk = calculate_bond_dv01(trade.symbol, trade.quantity, trade.price, book=trade.book)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # 1) Compute risk for THIS trade
-        try:
-            risk = calculate_bond_dv01(trade.symbol, trade.quantity, trade.price)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+    # 2-8) Checked and committed under the book's sequencer so concurrent
+    # trades for the same book cannot both pass against the same DV01
+    waiting = time.perf_counter()
+    async with SEQUENCER.book(db, trade.book):
+        TRADE_STAGE_SECONDS.observe(time.perf_counter() - waiting, "lock_wait")
 
-        # 2) Current book DV01
-        book_dv01_now = current_book_dv01(db, trade.book)
+        # 2) Current book DV01 + key-rate ladder (maintained position cache)
+        with TRADE_STAGE_SECONDS.time("book_dv01"):
+            book_dv01_now = await POSITIONS.book_dv01_async(db, trade.book)
+            book_buckets_now = POSITIONS.book_buckets(trade.book)
 
-        # 3) Limits decision
-        decision = evaluate_limits(
-            book=trade.book,
-            trade_notional=risk.notional,
-            trade_dv01=risk.dv01,
-            current_book_dv01=book_dv01_now,
-        )
+        # 3) Limits decision (compiled rule table for the book)
+        with TRADE_STAGE_SECONDS.time("limits"):
+            decision = evaluate_limits(
+                book=trade.book,
+                trade_notional=risk.notional,
+                trade_dv01=risk.dv01,
+                current_book_dv01=book_dv01_now,
+                trade_buckets=risk.buckets,
+                current_book_buckets=book_buckets_now,
+                symbol=trade.symbol,
+                current_symbol_dv01=POSITIONS.symbol_dv01(trade.book, trade.symbol),
+            )
+        _count_decision(decision.status, decision.reasons)
+
+        # Everything below is staged in one transaction and committed once:
+        # evaluation event, trade + TRADE_CREATED event, idempotency record.
 
         # 4) Audit evaluation (always)
         decision_payload = {
@@ -63,71 +98,393 @@ def create_trade(
             "trade_notional": risk.notional,
             "trade_dv01": risk.dv01,
             "book_dv01_before": book_dv01_now,
+            "reference_version": risk.reference_version,
+            "dv01_method": risk.method,
+            "trade_bucket_dv01": dict(zip(BUCKETS, risk.buckets)),
+            "limits_version": decision.limits_version,
             "decision": {"status": decision.status, "reasons": decision.reasons},
         }
-        db.add(Event(event_type="TRADE_EVALUATED", payload=json.dumps(decision_payload)))
-        db.commit()
+        AUDIT.record(
+            db,
+            "TRADE_EVALUATED",
+            decision_payload,
+            book=trade.book,
+            symbol=trade.symbol,
+            decision_status=decision.status,
+            reason_codes=decision.reasons,
+            trade_dv01=risk.dv01,
+            notional=risk.notional,
+        )
 
-        # 5) If blocked, store idempotency record and return 409
+        # 5) If blocked, the audit event and idempotency record commit together
         if decision.status == "BLOCK":
             blocked_payload = {
                 "status": "BLOCK",
                 "reasons": decision.reasons,
                 "book_dv01_before": book_dv01_now,
                 "book_dv01_after": book_dv01_now + risk.dv01,
+                "reference_version": risk.reference_version,
             }
 
+            blocked_response = json.dumps(blocked_payload)
+            if idempotency_key:
+                db.add(IdempotencyRecord(key=idempotency_key, response=blocked_response))
+            with TRADE_STAGE_SECONDS.time("commit"):
+                replayed = await _commit_or_replay(db, idempotency_key)
+            if replayed is not None:
+                return replayed
             if idempotency_key:
-                db.add(IdempotencyRecord(key=idempotency_key, response=json.dumps(blocked_payload)))
-                db.commit()
+                remember_response(idempotency_key, blocked_response)
 
-            raise HTTPException(status_code=409, detail=blocked_payload)
+        else:
+            # 6) Stage trade (flush assigns the trade id, nothing is committed yet)
+            db_trade = Trade(
+                symbol=trade.symbol,
+                quantity=trade.quantity,
+                price=trade.price,
+                book=trade.book,
+            )
+            db.add(db_trade)
+            AUDIT.record(
+                db,
+                "TRADE_CREATED",
+                trade.model_dump(),
+                book=trade.book,
+                symbol=trade.symbol,
+                trade_dv01=risk.dv01,
+                notional=risk.notional,
+            )
+            await db.flush()
 
-        # 6) Persist trade
-        db_trade = Trade(
-            symbol=trade.symbol,
-            quantity=trade.quantity,
-            price=trade.price,
-            book=trade.book,
-        )
-        db.add(db_trade)
-        db.add(Event(event_type="TRADE_CREATED", payload=json.dumps(trade.model_dump())))
-        db.commit()
-
-        # 7) Response payload (always returned)
-        response_payload: dict[str, Any] = {
-            "status": decision.status,  # PASS or WARN
-            "reasons": decision.reasons,
-            "trade_id": db_trade.id,
-            "book_dv01_before": book_dv01_now,
-            "book_dv01_after": book_dv01_now + risk.dv01,
-        }
+            # 7) Response payload (always returned)
+            response_payload: dict[str, Any] = {
+                "status": decision.status,  # PASS or WARN
+                "reasons": decision.reasons,
+                "trade_id": db_trade.id,
+                "book_dv01_before": book_dv01_now,
+                "book_dv01_after": book_dv01_now + risk.dv01,
+                "reference_version": risk.reference_version,
+            }
+
+            # 8) Idempotency record + single commit
+            response = json.dumps(response_payload)
+            if idempotency_key:
+                db.add(IdempotencyRecord(key=idempotency_key, response=response))
+            with TRADE_STAGE_SECONDS.time("commit"):
+                replayed = await _commit_or_replay(db, idempotency_key)
+            if replayed is not None:
+                return replayed
+            if idempotency_key:
+                remember_response(idempotency_key, response)
 
-        # store idempotency record for success
-        if idempotency_key:
-            db.add(IdempotencyRecord(key=idempotency_key, response=json.dumps(response_payload)))
-            db.commit()
+            POSITIONS.apply(trade.book, trade.quantity, risk)
 
-        return response_payload
+    # 9) Wait for the audit events (group mode flushes them in bulk), outside
+    # the book lock so the next trade for the book is not held up
+    with TRADE_STAGE_SECONDS.time("audit"):
+        await AUDIT.committed(db)
+    RESPONSES.bump("events")
 
-    finally:
-        db.close()
+    # 10) Push the events and the book's new DV01 to live dashboards
+    live_events = [
+        {"event_type": "TRADE_EVALUATED", "book": trade.book, "payload": decision_payload}
+    ]
+    if decision.status != "BLOCK":
+        live_events.append(
+            {"event_type": "TRADE_CREATED", "book": trade.book, "payload": trade.model_dump()}
+        )
+    publish_trade_updates(live_events, [trade.book])
 
+    if decision.status == "BLOCK":
+        raise HTTPException(status_code=409, detail=blocked_payload)
+    return response_payload
+
+
+async def _commit_or_replay(
+    db: AsyncSession, idempotency_key: str | None
+) -> dict[str, Any] | None:
+    """
+    Commits the request's transaction. If a concurrent request with the same
+    Idempotency-Key committed first, rolls everything back and returns that
+    request's stored response instead.
+    """
 
-@router.get("/")
-def list_trades() -> list[dict[str, Any]]:
-    db = get_db()
     try:
-        trades = db.query(Trade).all()
-        return [
+        await db.commit()
+        return None
+    except IntegrityError:
+        await db.rollback()
+        AUDIT.discard(db)
+        if not idempotency_key:
+            raise
+        existing = await db.get(IdempotencyRecord, idempotency_key)
+        if existing is None:
+            raise
+        return json.loads(existing.response)
+
+
+def _count_decision(status: str, reasons: list[str]) -> None:
+    TRADE_DECISIONS.inc(status)
+    for reason in reasons:
+        TRADE_REASONS.inc(reason)
+
+
+@router.post("/batch")
+async def create_trades_batch(
+    batch: BatchTradeRequest,
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
+    """
+    Evaluates a burst of trades in order. Each trade is checked against the
+    running book DV01 including the trades accepted before it in the batch;
+    all accepted trades and audit events are written in one transaction.
+    """
+
+    # the whole batch is priced at one instrument reference version
+    reference = REFERENCE.current
+
+    async with SEQUENCER.books(db, (t.book for t in batch.trades)):
+        running_dv01: dict[str, float] = {}
+        running_buckets: dict[str, tuple[float, ...]] = {}
+        running_symbol_dv01: dict[tuple[str, str], float] = {}
+        live_events: list[dict[str, Any]] = []
+        accepted = []  # (trade, risk, db_trade, result)
+        results: list[dict[str, Any]] = []
+
+        for index, trade in enumerate(batch.trades):
+            # 1) Compute risk for this trade (bad symbols are reported, not fatal)
+            try:
+                risk = calculate_bond_dv01(
+                    trade.symbol, trade.quantity, trade.price, reference, book=trade.book
+                )
+            except ValueError as e:
+                results.append({"index": index, "status": "ERROR", "error": str(e)})
+                continue
+
+            # 2) Running book DV01 (cache + accepted trades earlier in the batch)
+            if trade.book not in running_dv01:
+                running_dv01[trade.book] = await POSITIONS.book_dv01_async(db, trade.book)
+                running_buckets[trade.book] = POSITIONS.book_buckets(trade.book)
+            book_dv01_now = running_dv01[trade.book]
+            book_buckets_now = running_buckets[trade.book]
+            position_key = (trade.book, trade.symbol)
+            if position_key not in running_symbol_dv01:
+                running_symbol_dv01[position_key] = POSITIONS.symbol_dv01(*position_key)
+
+            # 3) Limits decision
+            decision = evaluate_limits(
+                book=trade.book,
+                trade_notional=risk.notional,
+                trade_dv01=risk.dv01,
+                current_book_dv01=book_dv01_now,
+                trade_buckets=risk.buckets,
+                current_book_buckets=book_buckets_now,
+                symbol=trade.symbol,
+                current_symbol_dv01=running_symbol_dv01[position_key],
+            )
+            _count_decision(decision.status, decision.reasons)
+
+            # 4) Audit evaluation (always)
+            decision_payload = {
+                "trade": trade.model_dump(),
+                "trade_notional": risk.notional,
+                "trade_dv01": risk.dv01,
+                "book_dv01_before": book_dv01_now,
+                "reference_version": risk.reference_version,
+                "dv01_method": risk.method,
+                "trade_bucket_dv01": dict(zip(BUCKETS, risk.buckets)),
+                "limits_version": decision.limits_version,
+                "decision": {"status": decision.status, "reasons": decision.reasons},
+            }
+            AUDIT.record(
+                db,
+                "TRADE_EVALUATED",
+                decision_payload,
+                book=trade.book,
+                symbol=trade.symbol,
+                decision_status=decision.status,
+                reason_codes=decision.reasons,
+                trade_dv01=risk.dv01,
+                notional=risk.notional,
+            )
+            live_events.append(
+                {"event_type": "TRADE_EVALUATED", "book": trade.book, "payload": decision_payload}
+            )
+
+            result: dict[str, Any] = {
+                "index": index,
+                "status": decision.status,
+                "reasons": decision.reasons,
+                "book_dv01_before": book_dv01_now,
+                "book_dv01_after": book_dv01_now + risk.dv01,
+                "reference_version": risk.reference_version,
+            }
+            results.append(result)
+
+            if decision.status == "BLOCK":
+                continue
+
+            # 5) Stage accepted trade; later trades in the batch see its DV01
+            db_trade = Trade(
+                symbol=trade.symbol,
+                quantity=trade.quantity,
+                price=trade.price,
+                book=trade.book,
+            )
+            db.add(db_trade)
+            AUDIT.record(
+                db,
+                "TRADE_CREATED",
+                trade.model_dump(),
+                book=trade.book,
+                symbol=trade.symbol,
+                trade_dv01=risk.dv01,
+                notional=risk.notional,
+            )
+            live_events.append(
+                {"event_type": "TRADE_CREATED", "book": trade.book, "payload": trade.model_dump()}
+            )
+            running_dv01[trade.book] = book_dv01_now + risk.dv01
+            running_symbol_dv01[position_key] += risk.dv01
+            running_buckets[trade.book] = tuple(
+                b + t for b, t in zip(book_buckets_now, risk.buckets)
+            )
+            accepted.append((trade, risk, db_trade, result))
+
+        # 6) One flush + commit for every trade and event in the batch
+        await db.flush()
+        for _, _, db_trade, result in accepted:
+            result["trade_id"] = db_trade.id
+        await db.commit()
+
+        for trade, risk, _, _ in accepted:
+            POSITIONS.apply(trade.book, trade.quantity, risk)
+
+    await AUDIT.committed(db)
+    RESPONSES.bump("events")
+    publish_trade_updates(live_events, {t.book for t in batch.trades})
+
+    return {
+        "accepted": len(accepted),
+        "blocked": sum(1 for r in results if r["status"] == "BLOCK"),
+        "errors": sum(1 for r in results if r["status"] == "ERROR"),
+        "results": results,
+    }
+
+
+@router.post("/what-if")
+async def what_if(
+    request: WhatIfRequest,
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
+    """
+    Pre-checks hypothetical trades without booking or auditing anything.
+
+    Each trade is evaluated on its own against the current book
+    ("standalone") and in sequence ("cumulative": on top of the candidates
+    before it that would pass). Book state, instrument reference and limits
+    are each read once for the whole call.
+    """
+
+    reference = REFERENCE.current
+    limit_set = LIMITS.current
+
+    # 1) One read of the current state of every book involved (uncached
+    #    books in one query, and not added to the cache)
+    positions = await POSITIONS.peek_async(db, {t.book for t in request.trades})
+    book_dv01 = {book: p.dv01 for book, p in positions.items()}
+    book_buckets = {book: tuple(p.buckets) for book, p in positions.items()}
+    symbol_dv01: dict[tuple[str, str], float] = {}
+
+    running_dv01 = dict(book_dv01)
+    running_buckets = dict(book_buckets)
+    running_symbol_dv01: dict[tuple[str, str], float] = {}
+
+    results: list[dict[str, Any]] = []
+    for index, trade in enumerate(request.trades):
+        # 2) Risk for this candidate
+        try:
+            risk = calculate_bond_dv01(
+                trade.symbol, trade.quantity, trade.price, reference, book=trade.book
+            )
+        except ValueError as e:
+            results.append({"index": index, "status": "ERROR", "error": str(e)})
+            continue
+
+        position_key = (trade.book, trade.symbol)
+        if position_key not in symbol_dv01:
+            sym = positions[trade.book].symbols.get(trade.symbol)
+            symbol_dv01[position_key] = sym.dv01 if sym else 0.0
+            running_symbol_dv01[position_key] = symbol_dv01[position_key]
+
+        # 3) Standalone and cumulative checks against the same snapshot
+        checks = {}
+        for mode, dv01_now, buckets_now, sym_now in (
+            ("standalone", book_dv01, book_buckets, symbol_dv01),
+            ("cumulative", running_dv01, running_buckets, running_symbol_dv01),
+        ):
+            args = dict(
+                book=trade.book,
+                trade_notional=risk.notional,
+                trade_dv01=risk.dv01,
+                current_book_dv01=dv01_now[trade.book],
+                trade_buckets=risk.buckets,
+                current_book_buckets=buckets_now[trade.book],
+                symbol=trade.symbol,
+                current_symbol_dv01=sym_now[position_key],
+                limit_set=limit_set,
+            )
+            decision = evaluate_limits(**args)
+            checks[mode] = {
+                "status": decision.status,
+                "reasons": decision.reasons,
+                "book_dv01_after": dv01_now[trade.book] + risk.dv01,
+                "headroom": limit_headroom(**args),
+            }
+
+        # 4) Only candidates that would be booked move the cumulative state
+        if checks["cumulative"]["status"] != "BLOCK":
+            running_dv01[trade.book] += risk.dv01
+            running_buckets[trade.book] = tuple(
+                b + t for b, t in zip(running_buckets[trade.book], risk.buckets)
+            )
+            running_symbol_dv01[position_key] += risk.dv01
+
+        results.append(
             {
-                "id": t.id,
-                "symbol": t.symbol,
-                "quantity": t.quantity,
-                "price": t.price,
-                "book": t.book,
+                "index": index,
+                "status": checks["cumulative"]["status"],
+                "trade_notional": risk.notional,
+                "trade_dv01": risk.dv01,
+                **checks,
             }
-            for t in trades
-        ]
-    finally:
-        db.close()
+        )
+
+    return {
+        "reference_version": reference.version,
+        "limits_version": limit_set.version,
+        "book_dv01": book_dv01,
+        "pass_standalone": sum(
+            1 for r in results if r["status"] != "ERROR" and r["standalone"]["status"] != "BLOCK"
+        ),
+        "pass_cumulative": sum(
+            1 for r in results if r["status"] != "ERROR" and r["cumulative"]["status"] != "BLOCK"
+        ),
+        "errors": sum(1 for r in results if r["status"] == "ERROR"),
+        "results": results,
+    }
+
+
+@router.get("/")
+async def list_trades(db: AsyncSession = Depends(get_async_db)) -> list[dict[str, Any]]:
+    trades = (await db.scalars(select(Trade))).all()
+    return [
+        {
+            "id": t.id,
+            "symbol": t.symbol,
+            "quantity": t.quantity,
+            "price": t.price,
+            "book": t.book,
+        }
+        for t in trades
+    ]
@@ -0,0 +1,244 @@
+"""
+Load benchmark for the trade submission and dashboard read paths.
+
+Seeds books with N trades each, then drives concurrent POST /trades/ and
+GET /api/summary through the app in-process (httpx + ASGITransport, no
+server or network) and prints throughput and latency percentiles as JSON.
+
+    python -m benchmarks.trade_load --sizes 1000,100000 --concurrency 16
+    python -m benchmarks.trade_load --database-url postgresql+psycopg2://... --output out.json
+
+WARNING: every size DROPS and recreates all tables in the target database.
+Point it at a scratch database only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+SYMBOLS = ("UKT5Y", "UKT10Y", "UKT30Y")
+SEED_CHUNK = 10_000
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="scratch DB (dropped)")
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000", help="trades seeded per book, comma separated"
+    )
+    parser.add_argument("--books", default="RATES", help="books to seed and trade, comma separated")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument(
+        "--scenarios", default="trades,summary,mixed", help="trades | summary | mixed"
+    )
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="share of reads in mixed")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per scenario")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    return parser.parse_args(argv)
+
+
+# ---------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------
+
+
+def seed(engine: Any, books: list[str], size: int) -> float:
+    """
+    Fresh schema plus `size` trades per book. Quantities alternate in sign
+    so the seeded books stay inside the DV01 limits and load trades are
+    evaluated as they would be on a normal day, not all blocked.
+    """
+
+    from sqlalchemy import insert
+
+    from infra.db.models import Base, Trade
+
+    start = time.perf_counter()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    created = datetime.utcnow() - timedelta(days=1)
+    with engine.begin() as conn:
+        for book in books:
+            for offset in range(0, size, SEED_CHUNK):
+                rows = [
+                    {
+                        "symbol": SYMBOLS[i % len(SYMBOLS)],
+                        "quantity": 100_000.0 if (i // len(SYMBOLS)) % 2 == 0 else -100_000.0,
+                        "price": 99.0 + (i % 200) / 100,
+                        "book": book,
+                        "created_at": created + timedelta(milliseconds=i),
+                    }
+                    for i in range(offset, min(offset + SEED_CHUNK, size))
+                ]
+                conn.execute(insert(Trade), rows)
+    return time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+
+
+def _trade_body(n: int, books: list[str]) -> dict[str, Any]:
+    # alternate buy / sell per symbol so the book does not drift into a limit
+    return {
+        "symbol": SYMBOLS[n % len(SYMBOLS)],
+        "quantity": 50_000.0 if (n // len(SYMBOLS)) % 2 == 0 else -50_000.0,
+        "price": 100.0,
+        "book": books[n % len(books)],
+    }
+
+
+async def run_scenario(
+    client: Any,
+    scenario: str,
+    books: list[str],
+    requests: int,
+    concurrency: int,
+    read_ratio: float,
+) -> dict[str, Any]:
+    import numpy as np
+
+    latencies: dict[str, list[float]] = {"trade": [], "summary": []}
+    statuses: dict[str, int] = {}
+    counter = iter(range(requests))
+
+    def is_read(n: int) -> bool:
+        if scenario == "summary":
+            return True
+        if scenario == "trades":
+            return False
+        # mixed: reads spread evenly at exactly `read_ratio`
+        return int((n + 1) * read_ratio) > int(n * read_ratio)
+
+    async def worker() -> None:
+        for n in counter:
+            read = is_read(n)
+            start = time.perf_counter()
+            if read:
+                response = await client.get("/api/summary")
+            else:
+                response = await client.post("/trades/", json=_trade_body(n, books))
+            elapsed = time.perf_counter() - start
+            latencies["summary" if read else "trade"].append(elapsed)
+            key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    def summarise(samples: list[float]) -> dict[str, float] | None:
+        if not samples:
+            return None
+        ms = np.asarray(samples) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {
+            "count": len(samples),
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(ms.max()),
+        }
+
+    return {
+        "scenario": scenario,
+        "requests": requests,
+        "duration_s": duration,
+        "throughput_rps": requests / duration if duration else 0.0,
+        "status_counts": statuses,
+        "latency": {k: summarise(v) for k, v in latencies.items() if v},
+    }
+
+
+async def bench(args: argparse.Namespace) -> dict[str, Any]:
+    # the app builds its engines at import time, so the URL must be set first
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("REFERENCE_POLL_INTERVAL_S", "0")
+    os.environ.setdefault("LIMITS_POLL_INTERVAL_S", "0")
+
+    import httpx
+
+    from apps.api.main import app
+    from infra.db.session import engine
+
+    books = [b.strip() for b in args.books.split(",") if b.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    results = []
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        seed_s = seed(engine, books, size)
+
+        # startup hooks: reference data, limits, position cache warm-up
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for scenario in scenarios:
+                    if args.warmup:
+                        await run_scenario(
+                            client, scenario, books, args.warmup, args.concurrency, args.read_ratio
+                        )
+                    result = await run_scenario(
+                        client, scenario, books, args.requests, args.concurrency, args.read_ratio
+                    )
+                    result.update({"book_trades": size, "seed_s": seed_s})
+                    results.append(result)
+                    print(
+                        f"{size:>9} trades/book  {scenario:<8} "
+                        f"{result['throughput_rps']:8.1f} req/s",
+                        file=sys.stderr,
+                    )
+
+    return {"meta": _meta(args, books), "results": results}
+
+
+def _meta(args: argparse.Namespace, books: list[str]) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_commit": commit,
+        "database": args.database_url.split("://")[0],
+        "books": books,
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "read_ratio": args.read_ratio,
+        "python": platform.python_version(),
+        "env": {
+            k: os.environ[k]
+            for k in ("AUDIT_MODE", "BOOK_LOCK_SCOPE", "BOOK_PRICING", "RESPONSE_CACHE")
+            if k in os.environ
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(bench(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,285 @@
-from dataclasses import dataclass
-from typing import List
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, List, Mapping, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.risk.bond import BUCKETS
+from infra.db.models import BookDesk, LimitRule
+from infra.db.versioned import VersionedStore
+
+LIMITS_NAME = "limits"  # reference_versions row bumped on every limit change
+LIMITS_POLL_INTERVAL_S = float(os.getenv("LIMITS_POLL_INTERVAL_S", "30"))
+
+LEVELS = ("FIRM", "DESK", "BOOK", "SYMBOL")
+BOOK_METRICS = ("trade_notional", "book_dv01", *(f"bucket_dv01_{b}" for b in BUCKETS))
+SYMBOL_METRICS = ("trade_notional", "symbol_dv01")
+
+# metric -> (hard breach reason, soft breach reason)
+REASONS = {
+    "trade_notional": ("LIM_TRADE_NOTIONAL_EXCEEDED", "LIM_TRADE_NOTIONAL_WARN"),
+    "book_dv01": ("LIM_BOOK_DV01_EXCEEDED", "LIM_BOOK_DV01_WARN"),
+    "symbol_dv01": ("LIM_SYMBOL_DV01_EXCEEDED", "LIM_SYMBOL_DV01_WARN"),
+    **{
+        f"bucket_dv01_{b}": (f"LIM_BUCKET_DV01_EXCEEDED_{b}", f"LIM_BUCKET_DV01_WARN_{b}")
+        for b in BUCKETS
+    },
+}
+
+# Written to an empty limits table on first start (the old hardcoded RATES limits).
+# No bucket limits: there were none before, set them with PUT /api/limits.
+SEED_LIMITS = [
+    {"level": "BOOK", "book": "RATES", "metric": "trade_notional", "block": 2_000_000},  # £2m
+    {"level": "BOOK", "book": "RATES", "metric": "book_dv01", "block": 2_000.0},  # £2k per bp
+]
 
 
 @dataclass(frozen=True)
 class LimitDecision:
     status: str  # PASS | WARN | BLOCK
     reasons: List[str]
+    limits_version: int = 0
+
+
+@dataclass(frozen=True)
+class Rule:
+    metric: str
+    level: str
+    warn: float  # inf when not set
+    block: float
+    warn_reason: str
+    block_reason: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "metric": self.metric,
+            "level": self.level,
+            "warn": None if math.isinf(self.warn) else self.warn,
+            "block": None if math.isinf(self.block) else self.block,
+        }
+
+
+@dataclass(frozen=True)
+class BookRules:
+    """
+    Flat rule table for one book: for each metric, the threshold from the
+    most specific level that sets it (BOOK, then its DESK, then FIRM), plus
+    per-symbol rules (this book's, else the any-book SYMBOL rows).
+    """
+
+    book: str
+    desk: str | None
+    rules: tuple[Rule, ...]
+    symbol_rules: Mapping[str, tuple[Rule, ...]]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "desk": self.desk,
+            "rules": [r.to_dict() for r in self.rules],
+            "symbols": {s: [r.to_dict() for r in rules] for s, rules in self.symbol_rules.items()},
+        }
+
+
+def validate_rule(row: dict[str, Any]) -> None:
+    level, metric = row.get("level"), row.get("metric")
+    if level not in LEVELS:
+        raise ValueError(f"Unknown limit level {level!r}")
+    required = {"FIRM": None, "DESK": "desk", "BOOK": "book", "SYMBOL": "symbol"}[level]
+    if required and not row.get(required):
+        raise ValueError(f"{level} limits need a {required}")
+    metrics = SYMBOL_METRICS if level == "SYMBOL" else BOOK_METRICS
+    if metric not in metrics:
+        raise ValueError(f"Metric {metric!r} is not valid at {level} level")
+
+
+def _scope(row: Any) -> tuple[str, Any]:
+    level = row.level
+    if level == "DESK":
+        return level, row.desk
+    if level == "BOOK":
+        return level, row.book
+    if level == "SYMBOL":
+        return level, (row.book, row.symbol)
+    return level, None
+
+
+@dataclass(frozen=True)
+class LimitSet:
+    """
+    All limit rows at one version, indexed by (level, key, metric). Per-book
+    rule tables are compiled on first use and never change afterwards.
+    """
+
+    version: int
+    desks: Mapping[str, str]
+    scoped: Mapping[tuple[str, Any, str], Rule]
+    _compiled: dict[str, BookRules] = field(default_factory=dict, compare=False, repr=False)
+
+    def for_book(self, book: str) -> BookRules:
+        rules = self._compiled.get(book)
+        if rules is None:
+            rules = self._compiled[book] = self._compile(book)
+        return rules
+
+    def books(self) -> list[str]:
+        named = {key for level, key, _ in self.scoped if level == "BOOK"}
+        named.update(key[0] for level, key, _ in self.scoped if level == "SYMBOL" and key[0])
+        named.update(self.desks)
+        return sorted(named)
+
+    def _compile(self, book: str) -> BookRules:
+        desk = self.desks.get(book)
+        rules = []
+        for metric in BOOK_METRICS:
+            for scope in (("BOOK", book), ("DESK", desk), ("FIRM", None)):
+                rule = self.scoped.get((*scope, metric))
+                if rule is not None:
+                    rules.append(rule)
+                    break
+
+        symbol_rules: dict[str, tuple[Rule, ...]] = {}
+        symbols = {key[1] for level, key, _ in self.scoped if level == "SYMBOL"}
+        for symbol in sorted(symbols):
+            found = []
+            for metric in SYMBOL_METRICS:
+                rule = self.scoped.get(("SYMBOL", (book, symbol), metric)) or self.scoped.get(
+                    ("SYMBOL", (None, symbol), metric)
+                )
+                if rule is not None:
+                    found.append(rule)
+            if found:
+                symbol_rules[symbol] = tuple(found)
+
+        return BookRules(
+            book=book, desk=desk, rules=tuple(rules), symbol_rules=MappingProxyType(symbol_rules)
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "default": self.for_book("*").to_dict(),  # books with no rows of their own
+            "books": {book: self.for_book(book).to_dict() for book in self.books()},
+        }
 
 
-# Simple per-book limits (we'll move to DB/config later)
-BOOK_LIMITS = {
-    "RATES": {
-        "max_trade_notional": 2_000_000,   # £2m per trade
-        "max_book_dv01": 2_000.0,          # £2k per bp
+def build_limit_set(version: int, rows: Sequence[Any], desks: Mapping[str, str]) -> LimitSet:
+    scoped = {}
+    for row in rows:
+        block_reason, warn_reason = REASONS[row.metric]
+        scoped[(*_scope(row), row.metric)] = Rule(
+            metric=row.metric,
+            level=row.level,
+            warn=math.inf if row.warn is None else row.warn,
+            block=math.inf if row.block is None else row.block,
+            warn_reason=warn_reason,
+            block_reason=block_reason,
+        )
+    return LimitSet(
+        version=version, desks=MappingProxyType(dict(desks)), scoped=MappingProxyType(scoped)
+    )
+
+
+class LimitStore(VersionedStore[LimitSet]):
+    """
+    Holds the current LimitSet (see VersionedStore).
+    """
+
+    name = LIMITS_NAME
+    label = "limits"
+    poll_interval_s = LIMITS_POLL_INTERVAL_S
+
+    def __init__(self) -> None:
+        super().__init__(build_limit_set(0, [], {}))
+
+    def seed(self, db: Session) -> None:
+        if db.scalar(select(LimitRule.id).limit(1)) is not None:
+            return
+        db.add_all(LimitRule(**row) for row in SEED_LIMITS)
+        self._seed_version(db)
+        db.commit()
+
+    def _build(self, db: Session, version: int) -> LimitSet:
+        rows = db.scalars(select(LimitRule)).all()
+        desks: dict[str, str] = dict(db.execute(select(BookDesk.book, BookDesk.desk)).all())
+        return build_limit_set(version, rows, desks)
+
+    async def _build_async(self, db: AsyncSession, version: int) -> LimitSet:
+        rows = (await db.scalars(select(LimitRule))).all()
+        desks: dict[str, str] = dict(
+            (await db.execute(select(BookDesk.book, BookDesk.desk))).all()
+        )
+        return build_limit_set(version, rows, desks)
+
+    def _describe(self, limit_set: LimitSet) -> str:
+        return f"{len(limit_set.scoped)} rules"
+
+    async def upsert(
+        self,
+        db: AsyncSession,
+        rules: list[dict[str, Any]] | None = None,
+        desks: dict[str, str] | None = None,
+    ) -> LimitSet:
+        """
+        Sets limit rows (a row with neither warn nor block removes that
+        limit) and book -> desk mappings, bumps the version and reloads.
+        """
+
+        now = datetime.utcnow()
+        for row in rules or []:
+            validate_rule(row)
+            await db.execute(
+                delete(LimitRule).where(
+                    LimitRule.level == row["level"],
+                    LimitRule.metric == row["metric"],
+                    *(
+                        getattr(LimitRule, col) == row[col]
+                        if row.get(col) is not None
+                        else getattr(LimitRule, col).is_(None)
+                        for col in ("desk", "book", "symbol")
+                    ),
+                )
+            )
+            if row.get("warn") is not None or row.get("block") is not None:
+                db.add(LimitRule(**row, updated_at=now))
+        for book, desk in (desks or {}).items():
+            await db.merge(BookDesk(book=book, desk=desk))
+        return await self._commit_and_reload(db)
+
+
+LIMITS = LimitStore()
+
+
+def _metric_values(
+    trade_notional: float,
+    trade_dv01: float,
+    current_book_dv01: float,
+    trade_buckets: Sequence[float] | None,
+    current_book_buckets: Sequence[float] | None,
+    current_symbol_dv01: float,
+) -> dict[str, float]:
+    # each limited metric as it would stand after the trade
+    values = {
+        "trade_notional": trade_notional,
+        "book_dv01": current_book_dv01 + trade_dv01,
+        "symbol_dv01": current_symbol_dv01 + trade_dv01,
     }
-}
+    if trade_buckets is not None and current_book_buckets is not None:
+        for bucket, trade_b, book_b in zip(BUCKETS, trade_buckets, current_book_buckets):
+            values[f"bucket_dv01_{bucket}"] = book_b + trade_b
+    return values
+
+
+def _applicable_rules(limit_set: LimitSet, book: str, symbol: str | None) -> tuple[Rule, ...]:
+    compiled = limit_set.for_book(book)
+    symbol_rules = compiled.symbol_rules.get(symbol, ()) if symbol else ()
+    return (*compiled.rules, *symbol_rules)
 
 
 def evaluate_limits(
@@ -22,22 +287,96 @@ def evaluate_limits(
     trade_notional: float,
     trade_dv01: float,
     current_book_dv01: float,
+    trade_buckets: Sequence[float] | None = None,
+    current_book_buckets: Sequence[float] | None = None,
+    symbol: str | None = None,
+    current_symbol_dv01: float = 0.0,
+    limit_set: LimitSet | None = None,
 ) -> LimitDecision:
-    limits = BOOK_LIMITS.get(book)
-    if limits is None:
+    limit_set = limit_set or LIMITS.current
+    rules = _applicable_rules(limit_set, book, symbol)
+    if not rules:
         # No config => warn, but allow (real teams vary; we’ll allow for now)
-        return LimitDecision(status="WARN", reasons=["NO_LIMITS_CONFIGURED"])
+        return LimitDecision(
+            status="WARN", reasons=["NO_LIMITS_CONFIGURED"], limits_version=limit_set.version
+        )
 
-    reasons: List[str] = []
-    status = "PASS"
+    values = _metric_values(
+        trade_notional,
+        trade_dv01,
+        current_book_dv01,
+        trade_buckets,
+        current_book_buckets,
+        current_symbol_dv01,
+    )
 
-    if trade_notional > limits["max_trade_notional"]:
-        reasons.append("LIM_TRADE_NOTIONAL_EXCEEDED")
-        status = "BLOCK"
+    # one or two comparisons per compiled rule
+    hard: List[str] = []
+    soft: List[str] = []
+    for rule in rules:
+        value = values.get(rule.metric)
+        if value is None:
+            continue
+        if value > rule.block:
+            hard.append(rule.block_reason)
+        elif value > rule.warn:
+            soft.append(rule.warn_reason)
+
+    status = "BLOCK" if hard else "WARN" if soft else "PASS"
+    return LimitDecision(status=status, reasons=hard + soft, limits_version=limit_set.version)
+
+
+def limit_headroom(
+    book: str,
+    trade_notional: float,
+    trade_dv01: float,
+    current_book_dv01: float,
+    trade_buckets: Sequence[float] | None = None,
+    current_book_buckets: Sequence[float] | None = None,
+    symbol: str | None = None,
+    current_symbol_dv01: float = 0.0,
+    limit_set: LimitSet | None = None,
+) -> dict[str, float]:
+    """
+    Room left under each hard limit once the trade is done, per metric
+    (negative: breached). Where a book and a symbol rule limit the same
+    metric, the tighter one counts.
+    """
+
+    values = _metric_values(
+        trade_notional,
+        trade_dv01,
+        current_book_dv01,
+        trade_buckets,
+        current_book_buckets,
+        current_symbol_dv01,
+    )
+    headroom: dict[str, float] = {}
+    for rule in _applicable_rules(limit_set or LIMITS.current, book, symbol):
+        value = values.get(rule.metric)
+        if value is None or math.isinf(rule.block):
+            continue
+        room = rule.block - value
+        headroom[rule.metric] = min(room, headroom.get(rule.metric, room))
+    return headroom
+
+
+def limit_utilization(
+    book: str,
+    book_dv01: float,
+    book_buckets: Sequence[float],
+    limit_set: LimitSet | None = None,
+) -> dict[str, float]:
+    """
+    Book DV01 and bucket DV01 as a fraction of their hard limits.
+    """
 
-    projected = current_book_dv01 + trade_dv01
-    if projected > limits["max_book_dv01"]:
-        reasons.append("LIM_BOOK_DV01_EXCEEDED")
-        status = "BLOCK"
+    values = {"book_dv01": book_dv01}
+    values.update((f"bucket_dv01_{b}", v) for b, v in zip(BUCKETS, book_buckets))
 
-    return LimitDecision(status=status, reasons=reasons)
+    utilization = {}
+    for rule in (limit_set or LIMITS.current).for_book(book).rules:
+        value = values.get(rule.metric)
+        if value is not None and not math.isinf(rule.block) and rule.block > 0:
+            utilization[rule.metric] = value / rule.block
+    return utilization
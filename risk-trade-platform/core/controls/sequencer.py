@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import zlib
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.risk.positions import POSITIONS
+
+# "process": one API worker, in-process locks are enough.
+# "cluster": several workers share the DB; also take a PostgreSQL advisory
+#            lock and, under it, reload the book position if another worker
+#            has booked into it (checked with a trade count).
+BOOK_LOCK_SCOPE = os.getenv("BOOK_LOCK_SCOPE", "process")
+
+
+def _advisory_key(book: str) -> int:
+    # stable across processes (unlike hash()), fits a signed bigint
+    return zlib.crc32(f"book:{book}".encode())
+
+
+class BookSequencer:
+    """
+    Serialises pre-trade checks per book: trades for the same book are
+    evaluated and committed one at a time, different books run in parallel.
+
+    Hold the lock from reading the book DV01 until the trade is committed,
+    otherwise two trades can both pass against the same starting DV01.
+    """
+
+    def __init__(self, scope: str = BOOK_LOCK_SCOPE) -> None:
+        self.scope = scope
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _lock(self, book: str) -> asyncio.Lock:
+        lock = self._locks.get(book)
+        if lock is None:
+            lock = self._locks.setdefault(book, asyncio.Lock())
+        return lock
+
+    @asynccontextmanager
+    async def book(self, db: AsyncSession, book: str) -> AsyncIterator[None]:
+        async with self._lock(book):
+            if self.scope == "cluster" and db.get_bind().dialect.name == "postgresql":
+                # released when the caller's transaction commits / rolls back
+                await db.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"), {"key": _advisory_key(book)}
+                )
+                # another worker may have booked trades since our cache was built
+                await POSITIONS.refresh_book_async(db, book)
+            yield
+
+    @asynccontextmanager
+    async def books(self, db: AsyncSession, books: Iterable[str]) -> AsyncIterator[None]:
+        # fixed (sorted) order so two multi-book batches cannot deadlock
+        async with AsyncExitStack() as stack:
+            for book in sorted(set(books)):
+                await stack.enter_async_context(self.book(db, book))
+            yield
+
+
+SEQUENCER = BookSequencer()
@@ -1,32 +1,53 @@
 from typing import List
-from core.risk.dv01 import calculate_bond_dv01
 
+from core.risk.bond import BUCKETS
+from core.risk.dv01 import bucket_dv01, position_dv01
+from core.risk.reference import REFERENCE
 
-def portfolio_dv01(trades: List[dict]) -> dict:
+
+def positions_dv01(positions: List[tuple]) -> dict:
+    """
+    Portfolio DV01 from net positions already aggregated per (book, symbol)
+    by the database (see core.risk.book.book_positions). DV01 is priced once
+    per symbol, by the book's pricing method, instead of once per trade.
+    """
+
+    index = REFERENCE.current
     total_dv01 = 0.0
     total_notional = 0.0
+    trade_count = 0
+    ladder = [0.0] * len(BUCKETS)
     breakdown = []
 
-    for trade in trades:
-        risk = calculate_bond_dv01(
-            symbol=trade["symbol"],
-            quantity=trade["quantity"],
-            price=trade["price"],
-        )
+    for book, symbol, count, net_quantity, gross in positions:
+        notional = gross / 100
+        dv01, method = position_dv01(book, symbol, net_quantity, notional, index)
+        buckets = bucket_dv01(symbol, dv01, index)
+        for i, value in enumerate(buckets):
+            ladder[i] += value
 
-        total_dv01 += risk.dv01
-        total_notional += risk.notional
+        total_dv01 += dv01
+        total_notional += notional
+        trade_count += count
 
         breakdown.append(
             {
-                "symbol": risk.symbol,
-                "dv01": risk.dv01,
-                "notional": risk.notional,
+                "book": book,
+                "symbol": symbol,
+                "trade_count": count,
+                "net_quantity": net_quantity,
+                "dv01": dv01,
+                "notional": notional,
+                "method": method,
+                "bucket_dv01": dict(zip(BUCKETS, buckets)),
             }
         )
 
     return {
         "portfolio_notional": total_notional,
         "portfolio_dv01": total_dv01,
+        "trade_count": trade_count,
+        "bucket_dv01": dict(zip(BUCKETS, ladder)),
         "breakdown": breakdown,
+        "reference_version": index.version,
     }
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+ONE_BP = 0.0001
+
+# Key-rate ladder: tenor (years) and bucket label
+KEY_TENORS = (2.0, 5.0, 10.0, 30.0)
+BUCKETS = ("2Y", "5Y", "10Y", "30Y")
+
+
+def parse_book_pricing(spec: str) -> dict[str, str]:
+    methods: dict[str, str] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        book, _, method = part.partition("=")
+        if method not in ("duration", "curve"):
+            raise ValueError(f"Bad BOOK_PRICING entry {part!r}, expected BOOK=duration|curve")
+        methods[book.strip()] = method
+    return methods
+
+
+# Per-book DV01 method, e.g. "RATES=curve". Books not listed use "duration".
+BOOK_PRICING = parse_book_pricing(os.getenv("BOOK_PRICING", ""))
+
+
+def pricing_method(book: str) -> str:
+    return BOOK_PRICING.get(book, "duration")
+
+
+@dataclass(frozen=True)
+class BondTerms:
+    coupon: float  # annual, % of face
+    maturity: date
+    frequency: int = 2  # coupons per year
+
+
+@dataclass(frozen=True)
+class ZeroCurve:
+    """
+    Continuously compounded zero rates (decimals) at `tenors` (years),
+    linearly interpolated, flat beyond the first / last point.
+    """
+
+    tenors: np.ndarray
+    rates: np.ndarray
+
+    def zero_rates(self, t: np.ndarray) -> np.ndarray:
+        return np.interp(t, self.tenors, self.rates)
+
+
+def year_fractions(maturities: list[date], as_of: date) -> np.ndarray:
+    return np.array([(m - as_of).days / 365.25 for m in maturities], dtype=np.float64)
+
+
+def cashflow_grid(
+    coupons: np.ndarray,
+    maturities: np.ndarray,
+    frequencies: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (times, cash) on a (bonds x periods) grid counted back from maturity,
+    per 100 face; cells past a bond's last coupon are zero.
+    """
+
+    periods = np.ceil(maturities * frequencies - 1e-9).astype(np.intp).clip(min=0)
+    k = np.arange(max(int(periods.max(initial=0)), 1))
+    times = maturities[:, None] - k[None, :] / frequencies[:, None]
+    live = k[None, :] < periods[:, None]
+    times = np.where(live, times, 0.0)
+
+    cash = np.where(live, (coupons / frequencies)[:, None], 0.0)
+    cash[:, 0] += np.where(periods > 0, 100.0, 0.0)
+    return times, cash
+
+
+def _present_value(times: np.ndarray, cash: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    return (cash * np.exp(-rates * times)).sum(axis=1)
+
+
+def bond_prices(
+    coupons: np.ndarray,
+    maturities: np.ndarray,
+    frequencies: np.ndarray,
+    curve: ZeroCurve,
+    shift: float = 0.0,
+) -> np.ndarray:
+    """
+    Dirty price per 100 face for a whole array of fixed-coupon bonds, with
+    every remaining cash flow discounted off `curve` shifted by `shift`.
+    All bonds are priced in one pass over the cash-flow grid.
+    """
+
+    times, cash = cashflow_grid(coupons, maturities, frequencies)
+    return _present_value(times, cash, curve.zero_rates(times) + shift)
+
+
+def bump_dv01(
+    coupons: np.ndarray,
+    maturities: np.ndarray,
+    frequencies: np.ndarray,
+    curve: ZeroCurve,
+) -> np.ndarray:
+    """
+    DV01 per 100 face: price change for a 1bp parallel move, by central
+    difference of a -1bp and +1bp reprice.
+    """
+
+    down = bond_prices(coupons, maturities, frequencies, curve, -ONE_BP)
+    up = bond_prices(coupons, maturities, frequencies, curve, ONE_BP)
+    return (down - up) / 2
+
+
+def key_rate_dv01(
+    coupons: np.ndarray,
+    maturities: np.ndarray,
+    frequencies: np.ndarray,
+    curve: ZeroCurve,
+    key_tenors: tuple[float, ...] = KEY_TENORS,
+) -> np.ndarray:
+    """
+    Key-rate DV01 per 100 face, shape (bonds x key tenors).
+
+    Each key rate is bumped ±1bp with a triangular weight that is 1 at its
+    tenor and 0 at its neighbours (flat beyond the first / last key), so the
+    bumps add up to a parallel shift.
+    """
+
+    times, cash = cashflow_grid(coupons, maturities, frequencies)
+    base = curve.zero_rates(times)
+    keys = np.asarray(key_tenors, dtype=np.float64)
+
+    out = np.empty((len(coupons), len(keys)), dtype=np.float64)
+    for j, unit in enumerate(np.eye(len(keys))):
+        bump = np.interp(times, keys, unit) * ONE_BP
+        out[:, j] = (
+            _present_value(times, cash, base - bump) - _present_value(times, cash, base + bump)
+        ) / 2
+    return out
+
+
+def nearest_bucket(years: float, key_tenors: tuple[float, ...] = KEY_TENORS) -> int:
+    return int(np.argmin(np.abs(np.asarray(key_tenors) - years)))
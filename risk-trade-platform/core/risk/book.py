@@ -1,3 +1,8 @@
+from datetime import datetime
+from typing import Collection
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.risk.dv01 import calculate_bond_dv01
@@ -9,6 +14,71 @@ def current_book_dv01(db: Session, book: str) -> float:
 
     total = 0.0
     for t in trades:
-        risk = calculate_bond_dv01(symbol=t.symbol, quantity=t.quantity, price=t.price)
+        risk = calculate_bond_dv01(symbol=t.symbol, quantity=t.quantity, price=t.price, book=book)
         total += risk.dv01
     return total
+
+
+PositionRow = tuple[str, str, int, float, float]
+
+
+def book_positions_stmt(
+    book: str | None = None,
+    after: datetime | None = None,
+    upto: datetime | None = None,
+    exclude: Collection[str] = (),
+    books: Collection[str] | None = None,
+) -> Select:
+    """
+    Net position per (book, symbol), aggregated in the database.
+
+    Selects rows of (book, symbol, trade_count, net_quantity, gross) where
+    gross is sum(quantity * price); cash notional is gross / 100.
+    `after` / `upto` restrict it to trades with after < created_at <= upto,
+    `exclude` leaves out trades by id, `books` reads several books at once.
+    """
+
+    stmt = select(
+        Trade.book,
+        Trade.symbol,
+        func.count(Trade.id),
+        func.sum(Trade.quantity),
+        func.sum(Trade.quantity * Trade.price),
+    )
+    if book is not None:
+        stmt = stmt.where(Trade.book == book)
+    if books is not None:
+        stmt = stmt.where(Trade.book.in_(list(books)))
+    if after is not None:
+        stmt = stmt.where(Trade.created_at > after)
+    if upto is not None:
+        stmt = stmt.where(Trade.created_at <= upto)
+    if exclude:
+        stmt = stmt.where(Trade.id.not_in(list(exclude)))
+
+    return stmt.group_by(Trade.book, Trade.symbol)
+
+
+def book_positions(db: Session, book: str | None = None) -> list[PositionRow]:
+    return _position_rows(db.execute(book_positions_stmt(book)).all())
+
+
+async def book_positions_async(
+    db: AsyncSession,
+    book: str | None = None,
+    after: datetime | None = None,
+    upto: datetime | None = None,
+    exclude: Collection[str] = (),
+    books: Collection[str] | None = None,
+) -> list[PositionRow]:
+    stmt = book_positions_stmt(book, after, upto, exclude, books)
+    return _position_rows((await db.execute(stmt)).all())
+
+
+async def book_trade_count_async(db: AsyncSession, book: str) -> int:
+    # served by ix_trades_book_created, no per-symbol aggregation
+    return await db.scalar(select(func.count(Trade.id)).where(Trade.book == book)) or 0
+
+
+def _position_rows(rows: list) -> list[PositionRow]:
+    return [(b, s, int(n), float(q), float(g)) for b, s, n, q, g in rows]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from core.risk.reference import REFERENCE, InstrumentIndex
+
+# Per-trade DV01 over whole columns, for the row-level export (/api/report/stream).
+# Aggregates go through positions_dv01, which prices one net position per
+# (book, symbol) and so never needs per-trade arrays.
+
+
+def encode_symbols(symbols: Sequence[str]) -> tuple[list[str], np.ndarray]:
+    """
+    Dictionary-encode symbols: returns the distinct symbols (first-seen
+    order) and an int array of codes into that list, one per trade.
+    """
+
+    index: dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(s, len(index)) for s in symbols),
+        dtype=np.intp,
+        count=len(symbols),
+    )
+    return list(index), codes
+
+
+def duration_table(symbols: Sequence[str], index: InstrumentIndex | None = None) -> np.ndarray:
+    """
+    Modified duration per distinct symbol (NaN where none is configured).
+    """
+
+    durations = (index or REFERENCE.current).durations
+    return np.array([durations.get(s, np.nan) for s in symbols], dtype=np.float64)
+
+
+def curve_dv01_table(symbols: Sequence[str], index: InstrumentIndex | None = None) -> np.ndarray:
+    """
+    Curve DV01 per 100 face per distinct symbol (NaN where the bond has no terms).
+    """
+
+    per_100 = (index or REFERENCE.current).curve_dv01()
+    return np.array([per_100.get(s, np.nan) for s in symbols], dtype=np.float64)
+
+
+def columnar_dv01(
+    codes: np.ndarray,
+    quantities: np.ndarray,
+    prices: np.ndarray,
+    durations: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Notional and DV01 for a whole book in one pass.
+
+    Same arithmetic, in the same order, as calculate_bond_dv01 so each
+    element is bit-for-bit identical to the per-trade result.
+    """
+
+    notional = quantities * prices / 100
+    dv01 = notional * durations[codes] * 0.0001
+    return notional, dv01
+
+
+def blend_curve_dv01(
+    codes: np.ndarray,
+    quantities: np.ndarray,
+    duration_dv01: np.ndarray,
+    curve_per_100: np.ndarray,
+    use_curve: np.ndarray,
+) -> np.ndarray:
+    """
+    Per-trade DV01 where rows in curve-priced books (`use_curve`) take the
+    curve DV01 and everything else keeps the duration result.
+    """
+
+    curve = quantities / 100 * curve_per_100[codes]
+    return np.where(use_curve & ~np.isnan(curve), curve, duration_dv01)
+
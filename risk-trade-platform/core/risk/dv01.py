@@ -1,4 +1,10 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from datetime import date
+
+from core.risk.bond import BUCKETS, pricing_method
+from core.risk.reference import REFERENCE, InstrumentIndex
 
 
 @dataclass
@@ -6,28 +12,76 @@ class BondRiskResult:
     symbol: str
     notional: float
     dv01: float
+    reference_version: int = 0
+    method: str = "duration"
+    buckets: tuple[float, ...] = (0.0,) * len(BUCKETS)  # key-rate DV01 ladder
+    valuation_date: date | None = None
 
 
-# Simple duration assumptions (hardcoded for now — later we externalise)
-DURATION_MAP = {
-    "UKT10Y": 8.5,
-    "UKT5Y": 4.7,
-    "UKT30Y": 18.0,
-}
-
-
-def calculate_bond_dv01(symbol: str, quantity: float, price: float) -> BondRiskResult:
+def dv01_from_notional(symbol: str, notional: float, index: InstrumentIndex | None = None) -> float:
     """
     Approx DV01 formula:
         DV01 = Notional × ModifiedDuration × 0.0001
+
+    Durations come from the instrument reference (`index`, default current).
     """
 
-    if symbol not in DURATION_MAP:
-        raise ValueError(f"No duration configured for {symbol}")
+    if index is None:
+        index = REFERENCE.current
+    duration = index.duration(symbol)
+    return notional * duration * 0.0001
 
-    notional = quantity * price / 100  # convert price quote to cash notional
-    duration = DURATION_MAP[symbol]
 
-    dv01 = notional * duration * 0.0001
+def position_dv01(
+    book: str | None,
+    symbol: str,
+    quantity: float,
+    notional: float,
+    index: InstrumentIndex | None = None,
+) -> tuple[float, str]:
+    """
+    DV01 of `quantity` face of `symbol` using the book's pricing method:
+    curve bump-and-reprice for books set to "curve" (when the bond has
+    terms), otherwise the duration approximation. Returns (dv01, method).
+    """
+
+    if index is None:
+        index = REFERENCE.current
+    if book is not None and pricing_method(book) == "curve":
+        per_100 = index.curve_dv01().get(symbol)
+        if per_100 is not None:
+            return quantity / 100 * per_100, "curve"
+    return dv01_from_notional(symbol, notional, index), "duration"
+
+
+def bucket_dv01(symbol: str, dv01: float, index: InstrumentIndex | None = None) -> tuple[float, ...]:
+    """
+    `dv01` split across the key-rate buckets by the instrument's profile.
+    """
+
+    if index is None:
+        index = REFERENCE.current
+    return tuple(dv01 * share for share in index.bucket_shares()[symbol])
+
+
+def calculate_bond_dv01(
+    symbol: str,
+    quantity: float,
+    price: float,
+    index: InstrumentIndex | None = None,
+    book: str | None = None,
+) -> BondRiskResult:
+    if index is None:
+        index = REFERENCE.current
+    notional = quantity * price / 100  # convert price quote to cash notional
+    dv01, method = position_dv01(book, symbol, quantity, notional, index)
 
-    return BondRiskResult(symbol=symbol, notional=notional, dv01=dv01)
+    return BondRiskResult(
+        symbol=symbol,
+        notional=notional,
+        dv01=dv01,
+        reference_version=index.version,
+        method=method,
+        buckets=bucket_dv01(symbol, dv01, index),
+        valuation_date=index.valuation_date,
+    )
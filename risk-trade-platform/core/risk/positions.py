@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Collection
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.risk.book import (
+    PositionRow,
+    book_positions,
+    book_positions_async,
+    book_trade_count_async,
+    current_book_dv01,
+)
+from core.risk.bond import BUCKETS
+from core.risk.dv01 import BondRiskResult, bucket_dv01, position_dv01
+from core.risk.reference import REFERENCE, InstrumentIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SymbolPosition:
+    net_quantity: float = 0.0
+    notional: float = 0.0
+    dv01: float = 0.0
+
+
+@dataclass
+class BookPosition:
+    dv01: float = 0.0
+    notional: float = 0.0
+    trade_count: int = 0
+    symbols: dict[str, SymbolPosition] = field(default_factory=dict)
+    buckets: list[float] = field(default_factory=lambda: [0.0] * len(BUCKETS))
+
+    def add_buckets(self, buckets: tuple[float, ...]) -> None:
+        for i, value in enumerate(buckets):
+            self.buckets[i] += value
+
+
+class BookPositionStore:
+    """
+    Net quantity / notional / DV01 per book and symbol, kept in step with
+    accepted trades so the pre-trade check never scans the trades table.
+
+    Books are loaded from the DB on first use (or all at once via `warm`),
+    then updated in place by `apply` after each accepted trade is committed.
+    The cache is per process: `verify` compares it with a full recompute and
+    can reload the book if another writer has moved it.
+
+    DV01s are priced at one instrument reference version and valuation
+    date; `reprice` moves the whole store to a new index when the reference
+    is swapped or rolls to a new day.
+
+    Every change to a book bumps its version counter (per process), which
+    read endpoints use for ETags and response caching.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._books: dict[str, BookPosition] = {}
+        self._index: InstrumentIndex = REFERENCE.current
+        self._versions: dict[str, int] = {}
+
+    def warm(self, db: Session) -> None:
+        with self._lock:
+            self._index = REFERENCE.current
+            self._books = _build_books(book_positions(db), self._index)
+            for book in self._books:
+                self._bump(book)
+
+    def load_book(self, db: Session, book: str) -> BookPosition:
+        return self._set_book(book, book_positions(db, book))
+
+    async def load_book_async(self, db: AsyncSession, book: str) -> BookPosition:
+        return self._set_book(book, await book_positions_async(db, book))
+
+    async def refresh_book_async(self, db: AsyncSession, book: str) -> BookPosition:
+        """
+        Reloads `book` only if the trades table has a different number of
+        trades for it than the cache (trades are never updated or deleted),
+        so an unchanged book costs a count instead of the full aggregation.
+        """
+
+        count = await book_trade_count_async(db, book)
+        with self._lock:
+            position = self._books.get(book)
+            if position is not None and position.trade_count == count:
+                return position
+        return await self.load_book_async(db, book)
+
+    def book_dv01(self, db: Session, book: str) -> float:
+        position = self._books.get(book)
+        if position is None:
+            position = self.load_book(db, book)
+        return position.dv01
+
+    async def book_dv01_async(self, db: AsyncSession, book: str) -> float:
+        position = self._books.get(book)
+        if position is None:
+            position = await self.load_book_async(db, book)
+        return position.dv01
+
+    async def peek_async(
+        self, db: AsyncSession, books: Collection[str]
+    ) -> dict[str, BookPosition]:
+        """
+        Copies of `books` for read-only checks. Books not in the cache are
+        aggregated in one query and returned without being stored, so a
+        check neither fills the cache nor bumps any book version.
+        """
+
+        with self._lock:
+            found = {book: _copy(self._books[book]) for book in books if book in self._books}
+            index = self._index
+
+        missing = [book for book in books if book not in found]
+        if missing:
+            built = _build_books(await book_positions_async(db, books=missing), index)
+            for book in missing:
+                found[book] = built.get(book, BookPosition())
+        return found
+
+    def book_buckets(self, book: str) -> tuple[float, ...]:
+        """
+        Key-rate DV01 ladder of a loaded book (see book_dv01 / book_dv01_async).
+        """
+
+        with self._lock:
+            position = self._books.get(book)
+            return tuple(position.buckets) if position else (0.0,) * len(BUCKETS)
+
+    def _bump(self, book: str) -> None:
+        # caller holds self._lock
+        self._versions[book] = self._versions.get(book, 0) + 1
+
+    def version(self, book: str) -> int:
+        return self._versions.get(book, 0)
+
+    def versions(self) -> tuple[tuple[str, int], ...]:
+        with self._lock:
+            return tuple(sorted(self._versions.items()))
+
+    def books(self) -> list[str]:
+        with self._lock:
+            return sorted(self._books)
+
+    def symbol_dv01(self, book: str, symbol: str) -> float:
+        with self._lock:
+            position = self._books.get(book)
+            sym = position.symbols.get(symbol) if position else None
+            return sym.dv01 if sym else 0.0
+
+    def _set_book(self, book: str, rows: list[PositionRow]) -> BookPosition:
+        with self._lock:
+            position = _build_books(rows, self._index).get(book, BookPosition())
+            # a reload that finds nothing new (e.g. every cluster-mode trade)
+            # keeps the book's version, and with it cached responses
+            if position != self._books.get(book, BookPosition()):
+                self._bump(book)
+            self._books[book] = position
+        return position
+
+    def apply(self, book: str, quantity: float, risk: BondRiskResult) -> None:
+        with self._lock:
+            dv01, buckets = risk.dv01, risk.buckets
+            if (risk.reference_version, risk.valuation_date) != (
+                self._index.version,
+                self._index.valuation_date,
+            ):
+                # priced just before a reference swap or date roll: book it at the
+                # store's index
+                dv01, _ = position_dv01(book, risk.symbol, quantity, risk.notional, self._index)
+                buckets = bucket_dv01(risk.symbol, dv01, self._index)
+
+            position = self._books.setdefault(book, BookPosition())
+            sym = position.symbols.setdefault(risk.symbol, SymbolPosition())
+            sym.net_quantity += quantity
+            sym.notional += risk.notional
+            sym.dv01 += dv01
+            position.notional += risk.notional
+            position.dv01 += dv01
+            position.trade_count += 1
+            position.add_buckets(buckets)
+            self._bump(book)
+
+    def reprice(self, index: InstrumentIndex) -> None:
+        """
+        Re-prices every cached position at `index` (no DB read: DV01 is
+        linear in position size). Symbols missing from the new reference
+        keep their previous DV01.
+        """
+
+        with self._lock:
+            for book, position in self._books.items():
+                position.dv01 = 0.0
+                position.buckets = [0.0] * len(BUCKETS)
+                for symbol, sym in position.symbols.items():
+                    try:
+                        sym.dv01, _ = position_dv01(
+                            book, symbol, sym.net_quantity, sym.notional, index
+                        )
+                        position.add_buckets(bucket_dv01(symbol, sym.dv01, index))
+                    except ValueError:
+                        logger.warning(
+                            "%s/%s not in reference v%d, DV01 not repriced",
+                            book,
+                            symbol,
+                            index.version,
+                        )
+                    position.dv01 += sym.dv01
+            self._index = index
+            for book in self._books:
+                self._bump(book)
+
+    def snapshot(self, book: str) -> dict[str, Any]:
+        with self._lock:
+            position = self._books.get(book, BookPosition())
+            return {
+                "book": book,
+                "loaded": book in self._books,
+                "reference_version": self._index.version,
+                "trade_count": position.trade_count,
+                "book_notional": position.notional,
+                "book_dv01": position.dv01,
+                "bucket_dv01": dict(zip(BUCKETS, position.buckets)),
+                "positions": [
+                    {
+                        "symbol": symbol,
+                        "net_quantity": p.net_quantity,
+                        "notional": p.notional,
+                        "dv01": p.dv01,
+                    }
+                    for symbol, p in sorted(position.symbols.items())
+                ],
+            }
+
+    def verify(
+        self,
+        db: Session,
+        book: str,
+        tolerance: float = 1e-6,
+        repair: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Compare the cached book DV01 with a trade-by-trade recompute.
+        With `repair`, hold the book's SEQUENCER lock around the call.
+        """
+
+        recomputed = current_book_dv01(db, book)
+        cached = self._books[book].dv01 if book in self._books else None
+
+        consistent = cached is not None and abs(cached - recomputed) <= tolerance * max(
+            1.0, abs(recomputed)
+        )
+        if not consistent and repair:
+            self.load_book(db, book)
+
+        return {
+            "book": book,
+            "cached_dv01": cached,
+            "recomputed_dv01": recomputed,
+            "consistent": consistent,
+            "repaired": not consistent and repair,
+        }
+
+
+def _build_books(rows: list[PositionRow], index: InstrumentIndex) -> dict[str, BookPosition]:
+    books: dict[str, BookPosition] = {}
+    for book, symbol, count, net_quantity, gross in rows:
+        notional = gross / 100
+        dv01, _ = position_dv01(book, symbol, net_quantity, notional, index)
+
+        position = books.setdefault(book, BookPosition())
+        position.symbols[symbol] = SymbolPosition(
+            net_quantity=net_quantity, notional=notional, dv01=dv01
+        )
+        position.notional += notional
+        position.dv01 += dv01
+        position.trade_count += count
+        position.add_buckets(bucket_dv01(symbol, dv01, index))
+    return books
+
+
+def _copy(position: BookPosition) -> BookPosition:
+    return replace(
+        position,
+        symbols={symbol: replace(p) for symbol, p in position.symbols.items()},
+        buckets=list(position.buckets),
+    )
+
+
+# One store per process, shared by the trade and risk routes
+POSITIONS = BookPositionStore()
+REFERENCE.on_swap(POSITIONS.reprice)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import numpy as np
+from sqlalchemy import Select, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.risk.bond import (
+    BUCKETS,
+    BondTerms,
+    ZeroCurve,
+    bump_dv01,
+    key_rate_dv01,
+    nearest_bucket,
+    year_fractions,
+)
+from infra.db.models import CurvePoint, Instrument
+from infra.db.versioned import VersionedStore
+
+REFERENCE_NAME = "instruments"
+REFERENCE_POLL_INTERVAL_S = float(os.getenv("REFERENCE_POLL_INTERVAL_S", "30"))
+
+# Written to empty tables on first start (durations: the old hardcoded map)
+SEED_DURATIONS = {
+    "UKT10Y": 8.5,
+    "UKT5Y": 4.7,
+    "UKT30Y": 18.0,
+}
+SEED_TERMS = {
+    "UKT5Y": BondTerms(coupon=4.125, maturity=date(2031, 7, 22)),
+    "UKT10Y": BondTerms(coupon=4.5, maturity=date(2036, 3, 7)),
+    "UKT30Y": BondTerms(coupon=4.375, maturity=date(2056, 7, 31)),
+}
+SEED_CURVE = {0.25: 0.0395, 1.0: 0.0380, 2.0: 0.0372, 5.0: 0.0385, 10.0: 0.0440, 30.0: 0.0505}
+
+
+@dataclass(frozen=True)
+class InstrumentIndex:
+    """
+    Read-only symbol -> modified duration map at one reference version.
+    """
+
+    version: int
+    durations: Mapping[str, float]
+    terms: Mapping[str, BondTerms] = field(default_factory=lambda: MappingProxyType({}))
+    curve: ZeroCurve | None = None
+    # default valuation date for curve DV01s; ReferenceStore rolls it daily
+    valuation_date: date = field(default_factory=lambda: datetime.utcnow().date())
+    # curve analytics by valuation date, filled on first use
+    _analytics: dict[date, CurveAnalytics] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def duration(self, symbol: str) -> float:
+        duration = self.durations.get(symbol)
+        if duration is None:
+            raise ValueError(f"No duration configured for {symbol}")
+        return duration
+
+    def curve_dv01(self, as_of: date | None = None) -> Mapping[str, float]:
+        """
+        Bump-and-reprice DV01 per 100 face for every bond with terms.
+        """
+
+        return self._analytics_at(as_of).dv01_per_100
+
+    def bucket_shares(self, as_of: date | None = None) -> Mapping[str, tuple[float, ...]]:
+        """
+        Fraction of each instrument's DV01 falling in each key-rate bucket
+        (sums to 1). Bonds with terms use their key-rate DV01 profile; the
+        rest go wholly to the bucket nearest their modified duration.
+        """
+
+        return self._analytics_at(as_of).bucket_shares
+
+    def _analytics_at(self, as_of: date | None) -> CurveAnalytics:
+        # priced once per version and valuation date, in one vectorised pass
+        as_of = as_of or self.valuation_date
+        analytics = self._analytics.get(as_of)
+        if analytics is None:
+            analytics = self._analytics[as_of] = _curve_analytics(self, as_of)
+        return analytics
+
+
+@dataclass(frozen=True)
+class CurveAnalytics:
+    dv01_per_100: Mapping[str, float]
+    bucket_shares: Mapping[str, tuple[float, ...]]
+
+
+def _curve_analytics(index: InstrumentIndex, as_of: date) -> CurveAnalytics:
+    shares: dict[str, tuple[float, ...]] = {}
+    for symbol, duration in index.durations.items():
+        one_hot = [0.0] * len(BUCKETS)
+        one_hot[nearest_bucket(duration)] = 1.0
+        shares[symbol] = tuple(one_hot)
+
+    dv01: dict[str, float] = {}
+    if index.curve is not None and index.terms:
+        symbols = list(index.terms)
+        terms = [index.terms[s] for s in symbols]
+        args = (
+            np.array([t.coupon for t in terms], dtype=np.float64),
+            year_fractions([t.maturity for t in terms], as_of),
+            np.array([t.frequency for t in terms], dtype=np.float64),
+            index.curve,
+        )
+        parallel = bump_dv01(*args)
+        key_rate = key_rate_dv01(*args)
+        totals = key_rate.sum(axis=1, keepdims=True)
+        profile = np.divide(key_rate, totals, out=np.zeros_like(key_rate), where=totals != 0)
+
+        dv01 = dict(zip(symbols, parallel.tolist()))
+        for symbol, row, total in zip(symbols, profile.tolist(), totals[:, 0].tolist()):
+            if total != 0:
+                shares[symbol] = tuple(row)
+
+    return CurveAnalytics(
+        dv01_per_100=MappingProxyType(dv01), bucket_shares=MappingProxyType(shares)
+    )
+
+
+def build_index(
+    version: int,
+    rows: list[tuple[Any, ...]],
+    curve_points: list[tuple[float, float]] | None = None,
+) -> InstrumentIndex:
+    """
+    `rows` are (symbol, modified_duration[, coupon, maturity, frequency]).
+    """
+
+    durations = {r[0]: r[1] for r in rows}
+    terms = {
+        r[0]: BondTerms(coupon=r[2], maturity=r[3], frequency=r[4] or 2)
+        for r in rows
+        if len(r) > 2 and r[2] is not None and r[3] is not None
+    }
+    curve = None
+    if curve_points:
+        points = sorted(curve_points)
+        curve = ZeroCurve(
+            tenors=np.array([p[0] for p in points], dtype=np.float64),
+            rates=np.array([p[1] for p in points], dtype=np.float64),
+        )
+    return InstrumentIndex(
+        version=version,
+        durations=MappingProxyType(durations),
+        terms=MappingProxyType(terms),
+        curve=curve,
+    )
+
+
+class ReferenceStore(VersionedStore[InstrumentIndex]):
+    """
+    Holds the current InstrumentIndex (see VersionedStore).
+    """
+
+    name = REFERENCE_NAME
+    label = "instrument reference"
+    poll_interval_s = REFERENCE_POLL_INTERVAL_S
+
+    @property
+    def current(self) -> InstrumentIndex:
+        # Curve DV01s age with the valuation date, so on the first read of a
+        # new day the index is swapped for a copy dated today, which reprices
+        # the cached positions (on_swap) and keeps every DV01 at one date.
+        index = self._current
+        today = datetime.utcnow().date()
+        if index.valuation_date != today:
+            self.swap(replace(index, valuation_date=today, _analytics={}))
+            index = self._current
+        return index
+
+    def _same(self, a: InstrumentIndex, b: InstrumentIndex) -> bool:
+        return a.version == b.version and a.valuation_date == b.valuation_date
+
+    def seed(self, db: Session) -> None:
+        if db.scalar(select(Instrument.symbol).limit(1)) is None:
+            db.add_all(
+                Instrument(
+                    symbol=s,
+                    modified_duration=d,
+                    coupon=SEED_TERMS[s].coupon,
+                    maturity=SEED_TERMS[s].maturity,
+                    frequency=SEED_TERMS[s].frequency,
+                )
+                for s, d in SEED_DURATIONS.items()
+            )
+        if db.scalar(select(CurvePoint.tenor_years).limit(1)) is None:
+            db.add_all(CurvePoint(tenor_years=t, zero_rate=r) for t, r in SEED_CURVE.items())
+        self._seed_version(db)
+        db.commit()
+
+    def _build(self, db: Session, version: int) -> InstrumentIndex:
+        rows = db.execute(_instruments_stmt()).all()
+        points = db.execute(_curve_stmt()).all()
+        return build_index(version, [tuple(r) for r in rows], [(t, r) for t, r in points])
+
+    async def _build_async(self, db: AsyncSession, version: int) -> InstrumentIndex:
+        rows = (await db.execute(_instruments_stmt())).all()
+        points = (await db.execute(_curve_stmt())).all()
+        return build_index(version, [tuple(r) for r in rows], [(t, r) for t, r in points])
+
+    def _describe(self, index: InstrumentIndex) -> str:
+        return f"{len(index.durations)} instruments"
+
+    async def upsert(
+        self,
+        db: AsyncSession,
+        instruments: list[dict[str, Any]] | None = None,
+        curve: dict[float, float] | None = None,
+    ) -> InstrumentIndex:
+        """
+        Adds / updates instruments and / or replaces the curve, bumps the
+        reference version and reloads.
+        """
+
+        now = datetime.utcnow()
+        for instrument in instruments or []:
+            await db.merge(Instrument(**instrument, updated_at=now))
+        if curve:
+            await db.execute(delete(CurvePoint))
+            db.add_all(CurvePoint(tenor_years=t, zero_rate=r) for t, r in curve.items())
+        return await self._commit_and_reload(db)
+
+
+def _instruments_stmt() -> Select[str, float, float | None, date | None, int]:
+    return select(
+        Instrument.symbol,
+        Instrument.modified_duration,
+        Instrument.coupon,
+        Instrument.maturity,
+        Instrument.frequency,
+    )
+
+
+def _curve_stmt() -> Select[float, float]:
+    return select(CurvePoint.tenor_years, CurvePoint.zero_rate)
+
+
+# Version 0 is the seed map, used until the table has been loaded
+REFERENCE = ReferenceStore(
+    build_index(
+        0,
+        [
+            (s, d, SEED_TERMS[s].coupon, SEED_TERMS[s].maturity, SEED_TERMS[s].frequency)
+            for s, d in SEED_DURATIONS.items()
+        ],
+        list(SEED_CURVE.items()),
+    )
+)
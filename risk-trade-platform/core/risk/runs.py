@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.controls.sequencer import SEQUENCER
+from core.risk.aggregate import positions_dv01
+from core.risk.book import PositionRow, book_positions_async
+from infra.db.models import RiskRun, Trade
+
+# A trade's created_at is set before it commits, so a trade can land behind
+# a run's high-water mark (slow commit on another worker, clock skew). Each
+# delta re-reads this window before the mark and skips the trades the base
+# run already holds; anything later than that is picked up by full runs.
+RISK_RUN_OVERLAP_S = float(os.getenv("RISK_RUN_OVERLAP_S", "300"))
+
+
+async def latest_run(
+    db: AsyncSession,
+    book: str,
+    at_or_before: datetime | None = None,
+) -> RiskRun | None:
+    """
+    Most recent run for `book`, the base for the next delta.
+    """
+
+    stmt = select(RiskRun).where(RiskRun.book == book)
+    if at_or_before is not None:
+        stmt = stmt.where(RiskRun.created_at <= at_or_before)
+    stmt = stmt.order_by(RiskRun.created_at.desc()).limit(1)
+    return (await db.scalars(stmt)).first()
+
+
+def run_positions(run: RiskRun) -> list[PositionRow]:
+    """
+    Per-symbol positions stored in a run's report, as position rows.
+    """
+
+    report = json.loads(run.report)
+    return [
+        (p["book"], p["symbol"], p["trade_count"], p["net_quantity"], p["notional"] * 100)
+        for p in report["risk"].get("breakdown", [])
+    ]
+
+
+def merge_positions(base: list[PositionRow], delta: list[PositionRow]) -> list[PositionRow]:
+    merged: dict[tuple[str, str], list[Any]] = {(b, s): [b, s, n, q, g] for b, s, n, q, g in base}
+    for b, s, n, q, g in delta:
+        row = merged.setdefault((b, s), [b, s, 0, 0.0, 0.0])
+        row[2] += n
+        row[3] += q
+        row[4] += g
+    return [tuple(row) for _, row in sorted(merged.items())]  # type: ignore[misc]
+
+
+async def replay_positions(
+    db: AsyncSession,
+    book: str,
+    base: RiskRun | None,
+    upto: datetime | None = None,
+) -> tuple[list[PositionRow], datetime | None, list[str]]:
+    """
+    Positions for `book` as of `upto` (default: now): the base run's
+    positions plus the trades it does not hold, read from the overlap
+    window before its high-water mark onwards.
+    Returns the positions, the new high-water mark and its tail trade ids.
+    """
+
+    after = base.high_water_mark if base is not None else None
+    seen = set(base.tail_trade_ids or []) if base is not None else set()
+    since = after - timedelta(seconds=RISK_RUN_OVERLAP_S) if after is not None else None
+
+    # 1) Newest trade not in the base
+    hwm_stmt = select(func.max(Trade.created_at)).where(Trade.book == book)
+    if since is not None:
+        hwm_stmt = hwm_stmt.where(Trade.created_at > since)
+    if seen:
+        hwm_stmt = hwm_stmt.where(Trade.id.not_in(list(seen)))
+    if upto is not None:
+        hwm_stmt = hwm_stmt.where(Trade.created_at <= upto)
+    newest = await db.scalar(hwm_stmt)
+
+    base_rows = run_positions(base) if base is not None else []
+    if newest is None:
+        return base_rows, after, sorted(seen)
+
+    # 2) Delta, bounded by the mark we record
+    mark = max(after, newest) if after is not None else newest
+    delta = await book_positions_async(db, book, after=since, upto=mark, exclude=seen)
+
+    # 3) Every trade in the window before the new mark is now in the run
+    tail = await db.scalars(
+        select(Trade.id).where(
+            Trade.book == book,
+            Trade.created_at > mark - timedelta(seconds=RISK_RUN_OVERLAP_S),
+            Trade.created_at <= mark,
+        )
+    )
+    return merge_positions(base_rows, delta), mark, sorted(tail.all())
+
+
+async def positions_as_of(
+    db: AsyncSession, book: str, ts: datetime
+) -> tuple[list[PositionRow], RiskRun | None]:
+    """
+    Positions for `book` as they stood at `ts` (naive UTC): the nearest run
+    at or before `ts`, plus a replay of only the trades booked between its
+    high-water mark and `ts`.
+    """
+
+    base = await latest_run(db, book, at_or_before=ts)
+    positions, _, _ = await replay_positions(db, book, base, upto=ts)
+    return positions, base
+
+
+def build_report(book: str, positions: list[PositionRow], generated_at: datetime) -> dict[str, Any]:
+    risk = {"message": "No trades available"} if not positions else positions_dv01(positions)
+    return {
+        "generated_at": generated_at.isoformat() + "Z",
+        "book": book,
+        "trade_count": sum(p[2] for p in positions),
+        "risk": risk,
+    }
+
+
+async def create_risk_run(db: AsyncSession, book: str, full: bool = False) -> RiskRun:
+    """
+    Persists a risk snapshot for `book`, built from the previous run plus the
+    trades booked since (or from scratch when `full` or there is no base).
+
+    Built under the book's sequencer (the advisory lock in cluster scope), so
+    no trade for the book commits while its trades are being read.
+    """
+
+    async with SEQUENCER.book(db, book):
+        base = None if full else await latest_run(db, book)
+        positions, high_water_mark, tail = await replay_positions(db, book, base)
+
+        generated_at = datetime.utcnow()
+        payload = build_report(book, positions, generated_at)
+        payload["base_run_id"] = base.id if base is not None else None
+        payload["high_water_mark"] = high_water_mark.isoformat() if high_water_mark else None
+
+        run = RiskRun(
+            book=book,
+            report=json.dumps(payload),
+            created_at=generated_at,
+            base_run_id=payload["base_run_id"],
+            high_water_mark=high_water_mark,  # None: no trades yet
+            tail_trade_ids=tail,
+        )
+        db.add(run)
+        await db.commit()
+    return run
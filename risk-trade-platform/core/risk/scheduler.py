@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.controls.sequencer import BOOK_LOCK_SCOPE
+from core.risk.runs import create_risk_run
+from infra.db.models import Trade
+from infra.db.session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+# Per-book cadence in seconds, e.g. "RATES=300,CREDIT=900". Empty: no schedule.
+RISK_RUN_SCHEDULE = os.getenv("RISK_RUN_SCHEDULE", "")
+RISK_RUN_WORKERS = int(os.getenv("RISK_RUN_WORKERS", "4"))
+RISK_RUN_JOB_HISTORY = int(os.getenv("RISK_RUN_JOB_HISTORY", "1000"))
+# Every Nth scheduled run is a full recompute, so a delta chain never drifts
+# for long (e.g. a trade that committed behind the overlap window). 0: never.
+RISK_RUN_FULL_EVERY = int(os.getenv("RISK_RUN_FULL_EVERY", "12"))
+# Which workers run the schedule. "auto": in cluster scope on PostgreSQL only
+# the one holding an advisory lock, otherwise every worker (one process).
+# "on" / "off" force it, e.g. "off" on all but one worker without PostgreSQL.
+RISK_RUN_SCHEDULER_LEADER = os.getenv("RISK_RUN_SCHEDULER_LEADER", "auto")
+SCHEDULER_LOCK_KEY = zlib.crc32(b"risk-run-scheduler")
+
+
+def parse_schedule(spec: str) -> dict[str, float]:
+    schedule: dict[str, float] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        book, _, interval = part.partition("=")
+        if not book or not interval or float(interval) <= 0:
+            raise ValueError(f"Bad RISK_RUN_SCHEDULE entry {part!r}, expected BOOK=SECONDS")
+        schedule[book.strip()] = float(interval)
+    return schedule
+
+
+@dataclass
+class RiskRunJob:
+    job_id: str
+    book: str
+    full: bool
+    trigger: str  # "schedule" | "manual"
+    status: str = "QUEUED"  # QUEUED -> RUNNING -> DONE | FAILED
+    run_id: str | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out = asdict(self)
+        for k in ("created_at", "started_at", "finished_at"):
+            out[k] = out[k].isoformat() + "Z" if out[k] else None
+        return out
+
+
+class RiskRunScheduler:
+    """
+    Generates RiskRun snapshots in the background.
+
+    Books on the schedule get a run every `interval` seconds, on the leader
+    worker only; `submit` queues one on demand. At most `workers` runs execute
+    at once, and never two for the same book: submitting a book that already
+    has a job queued or running returns that job instead of stacking another,
+    unless it is a delta and a full run was asked for, which is queued to
+    start once the delta finishes.
+    """
+
+    def __init__(
+        self,
+        schedule: dict[str, float] | None = None,
+        workers: int = RISK_RUN_WORKERS,
+        history: int = RISK_RUN_JOB_HISTORY,
+        full_every: int = RISK_RUN_FULL_EVERY,
+        leader: str = RISK_RUN_SCHEDULER_LEADER,
+    ) -> None:
+        self.schedule = parse_schedule(RISK_RUN_SCHEDULE) if schedule is None else schedule
+        self.workers = workers
+        self.history = history
+        self.full_every = full_every
+        self.leader = leader
+        self._jobs: OrderedDict[str, RiskRunJob] = OrderedDict()
+        self._active: dict[str, RiskRunJob] = {}  # book -> queued/running job
+        self._follow_ups: dict[str, RiskRunJob] = {}  # book -> full run after the active delta
+        self._leader_lock = asyncio.Lock()
+        self._leader_conn: AsyncConnection | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._timers: list[asyncio.Task[None]] = []
+        self._slots: asyncio.Semaphore | None = None
+
+    def start(self) -> None:
+        if self._timers:
+            return
+        for book, interval in self.schedule.items():
+            self._timers.append(asyncio.create_task(self._every(book, interval)))
+
+    async def stop(self) -> None:
+        self._follow_ups.clear()
+        tasks = [*self._timers, *self._tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timers.clear()
+        self._tasks.clear()
+        self._active.clear()
+        if self._leader_conn is not None:
+            await self._leader_conn.close()  # releases the advisory lock
+            self._leader_conn = None
+
+    def submit(self, book: str, full: bool = False, trigger: str = "manual") -> RiskRunJob:
+        active = self._active.get(book)
+        if active is not None:
+            if not full or active.full:
+                return active
+            # a delta would not satisfy a full request: run one right after it
+            follow_up = self._follow_ups.get(book)
+            if follow_up is None:
+                follow_up = self._follow_ups[book] = self._new_job(book, True, trigger)
+            return follow_up
+
+        job = self._new_job(book, full, trigger)
+        self._start(job)
+        return job
+
+    def _new_job(self, book: str, full: bool, trigger: str) -> RiskRunJob:
+        job = RiskRunJob(job_id=str(uuid.uuid4()), book=book, full=full, trigger=trigger)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+        return job
+
+    def _start(self, job: RiskRunJob) -> None:
+        self._active[job.book] = job
+        task = asyncio.create_task(self._execute(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def submit_all(self, full: bool = False) -> list[RiskRunJob]:
+        """
+        One job per book that has trades (plus scheduled books), e.g. end of day.
+        """
+
+        async with AsyncSessionLocal() as db:
+            books = set((await db.scalars(select(Trade.book).distinct())).all())
+        books.update(self.schedule)
+        return [self.submit(book, full=full) for book in sorted(books)]
+
+    def get(self, job_id: str) -> RiskRunJob | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self, book: str | None = None, limit: int = 50) -> list[RiskRunJob]:
+        jobs = [j for j in reversed(self._jobs.values()) if book is None or j.book == book]
+        return jobs[:limit]
+
+    async def _every(self, book: str, interval: float) -> None:
+        n = 0
+        while True:
+            await asyncio.sleep(interval)
+            if not await self._is_leader():
+                continue
+            n += 1
+            full = self.full_every > 0 and n % self.full_every == 0
+            self.submit(book, full=full, trigger="schedule")
+
+    async def _is_leader(self) -> bool:
+        """
+        Whether this worker runs the schedule. With several workers on one
+        PostgreSQL database, the leader is whichever holds a session advisory
+        lock; it keeps a connection open for it and leads until it stops.
+        """
+
+        if self.leader != "auto":
+            return self.leader == "on"
+        if BOOK_LOCK_SCOPE != "cluster" or async_engine.dialect.name != "postgresql":
+            return True
+
+        async with self._leader_lock:  # one check for all the book timers
+            conn = self._leader_conn
+            try:
+                if conn is not None:
+                    await conn.execute(text("SELECT 1"))  # still connected, still ours
+                    await conn.commit()
+                    return True
+                conn = await async_engine.connect()
+                got = await conn.scalar(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}
+                )
+                await conn.commit()
+                if not got:
+                    await conn.close()
+                    return False
+                logger.info("risk run scheduler: leading")
+                self._leader_conn = conn
+                return True
+            except Exception:
+                # lost the connection (and with it the lock): try again next tick
+                logger.exception("risk run scheduler: leader check failed")
+                if conn is not None:
+                    await conn.invalidate()
+                self._leader_conn = None
+                return False
+
+    async def _execute(self, job: RiskRunJob) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        try:
+            async with self._slots:
+                job.status = "RUNNING"
+                job.started_at = datetime.utcnow()
+                async with AsyncSessionLocal() as db:
+                    run = await create_risk_run(db, job.book, full=job.full)
+                job.run_id = run.id
+                job.status = "DONE"
+        except asyncio.CancelledError:
+            job.status = "FAILED"
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception("risk run for %s failed", job.book)
+            job.status = "FAILED"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._active.pop(job.book, None)
+            follow_up = self._follow_ups.pop(job.book, None)
+            if follow_up is not None:
+                self._start(follow_up)
+
+
+RISK_SCHEDULER = RiskRunScheduler()
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infra.db.models import Event
+from infra.db.session import AsyncSessionLocal
+from infra.metrics import AUDIT_EVENTS_DROPPED, AUDIT_EVENTS_SPILLED
+
+logger = logging.getLogger(__name__)
+
+# "sync":  events are added to the request's own transaction (one commit),
+#          so a trade and its audit rows commit or roll back together.
+# "group": events are queued and bulk-inserted by a background writer; the
+#          request still waits until its batch is committed (group commit).
+#          This gives up that atomicity: the trade is already committed when
+#          its events are written. A failed insert is retried, then the rows
+#          are spilled to AUDIT_SPILL_PATH and inserted on the next start;
+#          only if the spill fails too are they lost (audit_events_dropped_total).
+AUDIT_MODE = os.getenv("AUDIT_MODE", "sync")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_MS = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "5"))
+AUDIT_FLUSH_RETRIES = int(os.getenv("AUDIT_FLUSH_RETRIES", "3"))
+AUDIT_SPILL_PATH = os.getenv("AUDIT_SPILL_PATH", "audit_spill.jsonl")  # empty: no spill
+
+_PENDING = "audit_pending"
+
+
+class AuditWriter:
+    """
+    Writes TRADE_EVALUATED / TRADE_CREATED events.
+
+    Call `record` while building the request's transaction and `committed`
+    once it has committed. In group mode the events of a trade that failed
+    to commit are dropped with `discard`; in sync mode they roll back with it.
+    """
+
+    def __init__(
+        self,
+        mode: str = AUDIT_MODE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_s: float = AUDIT_FLUSH_INTERVAL_MS / 1000,
+        retries: int = AUDIT_FLUSH_RETRIES,
+        spill_path: str = AUDIT_SPILL_PATH,
+    ) -> None:
+        if mode not in ("sync", "group"):
+            raise ValueError(f"Unknown AUDIT_MODE {mode!r}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.retries = retries
+        self.spill_path = spill_path
+        self._queue: asyncio.Queue[tuple[list[dict[str, Any]], asyncio.Future[None]]] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def record(
+        self,
+        db: AsyncSession,
+        event_type: str,
+        payload: dict[str, Any],
+        book: str | None = None,
+        symbol: str | None = None,
+        decision_status: str | None = None,
+        reason_codes: list[str] | None = None,
+        trade_dv01: float | None = None,
+        notional: float | None = None,
+    ) -> None:
+        row = {
+            "event_type": event_type,
+            "payload": payload,
+            "created_at": datetime.utcnow(),
+            "book": book,
+            "symbol": symbol,
+            "decision_status": decision_status,
+            "reason_codes": reason_codes,
+            "trade_dv01": trade_dv01,
+            "notional": notional,
+        }
+        if self.mode == "sync":
+            db.add(Event(**row))
+        else:
+            db.info.setdefault(_PENDING, []).append(row)
+
+    async def committed(self, db: AsyncSession) -> None:
+        rows = db.info.pop(_PENDING, None)
+        if not rows:
+            return
+
+        self.start()
+        assert self._queue is not None
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((rows, done))
+        await done
+
+    def discard(self, db: AsyncSession) -> None:
+        db.info.pop(_PENDING, None)
+
+    def start(self) -> None:
+        if self.mode != "group" or (self._task is not None and not self._task.done()):
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # flush anything still queued so waiting requests are released
+        if self._queue is not None and not self._queue.empty():
+            await self._flush(self._drain(self.batch_size * 1000))
+
+    def _drain(self, limit: int) -> list[tuple[list[dict[str, Any]], asyncio.Future[None]]]:
+        assert self._queue is not None
+        items = []
+        while len(items) < limit and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                size = len(batch[0][0])
+                deadline = loop.time() + self.flush_interval_s
+
+                # size or time trigger, whichever comes first
+                while size < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(item)
+                    size += len(item[0])
+            except asyncio.CancelledError:
+                # stopped while collecting: these are off the queue already
+                await self._flush(batch)
+                raise
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[list[dict[str, Any]], asyncio.Future[None]]]) -> None:
+        if not batch:
+            return
+        rows = [row for item_rows, _ in batch for row in item_rows]
+        for attempt in range(self.retries + 1):
+            try:
+                await self._insert(rows)
+                break
+            except Exception:
+                logger.warning(
+                    "audit flush of %d events failed (attempt %d)", len(rows), attempt + 1
+                )
+                if attempt < self.retries:
+                    await asyncio.sleep(0.05 * 2**attempt)
+        else:
+            # the trades are committed already: failing the requests now would
+            # only invite retries that book them twice
+            self._spill(rows)
+
+        for _, done in batch:
+            if not done.done():
+                done.set_result(None)
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            for i in range(0, len(rows), self.batch_size):
+                await db.execute(insert(Event).values(rows[i : i + self.batch_size]))
+            await db.commit()
+
+    def _spill(self, rows: list[dict[str, Any]]) -> None:
+        try:
+            if not self.spill_path:
+                raise RuntimeError("AUDIT_SPILL_PATH is not set")
+            with open(self.spill_path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n")
+        except Exception:
+            logger.exception("audit flush failed, %d events dropped", len(rows))
+            AUDIT_EVENTS_DROPPED.inc(amount=len(rows))
+            return
+        logger.error("audit flush failed, %d events spilled to %s", len(rows), self.spill_path)
+        AUDIT_EVENTS_SPILLED.inc(amount=len(rows))
+
+    async def recover(self) -> int:
+        """
+        Inserts events spilled by an earlier failed flush (run on start-up,
+        in either mode) and removes the spill file. Returns the event count.
+        """
+
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        with open(self.spill_path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        if rows:
+            await self._insert(rows)
+        os.remove(self.spill_path)
+        logger.info("recovered %d spilled audit events", len(rows))
+        return len(rows)
+
+
+AUDIT = AuditWriter()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infra.db.models import IdempotencyRecord
+from infra.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# How long a key is honoured; older records are treated as unseen and purged
+IDEMPOTENCY_RETENTION_HOURS = float(os.getenv("IDEMPOTENCY_RETENTION_HOURS", "24"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_PURGE_INTERVAL_S = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_S", "300"))
+
+
+class IdempotencyCache:
+    """
+    Bounded LRU of recent Idempotency-Keys -> serialized response, each entry
+    expiring when its record falls out of the retention window.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str, ttl_s: float) -> None:
+        if ttl_s <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_s, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+IDEMPOTENCY_CACHE = IdempotencyCache(IDEMPOTENCY_CACHE_SIZE)
+
+
+def _retention() -> timedelta:
+    return timedelta(hours=IDEMPOTENCY_RETENTION_HOURS)
+
+
+async def lookup_response(db: AsyncSession, key: str) -> dict[str, Any] | None:
+    """
+    Stored response for `key`, from the cache or (on a miss) the DB.
+    An expired record is deleted in the caller's transaction so the key
+    can be reused.
+    """
+
+    cached = IDEMPOTENCY_CACHE.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    record = await db.get(IdempotencyRecord, key)
+    if record is None:
+        return None
+
+    age = datetime.utcnow() - record.created_at
+    if age >= _retention():
+        await db.delete(record)
+        await db.flush()
+        return None
+
+    IDEMPOTENCY_CACHE.put(key, record.response, (_retention() - age).total_seconds())
+    return json.loads(record.response)
+
+
+def remember_response(key: str, response: str) -> None:
+    """
+    Write-through: call once the IdempotencyRecord has been committed.
+    """
+
+    IDEMPOTENCY_CACHE.put(key, response, _retention().total_seconds())
+
+
+async def purge_expired(db: AsyncSession) -> int:
+    cutoff = datetime.utcnow() - _retention()
+    result = await db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.created_at < cutoff))
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def purge_loop(interval_s: float = IDEMPOTENCY_PURGE_INTERVAL_S) -> None:
+    """
+    Background task: bulk-deletes records older than the retention window.
+    """
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                purged = await purge_expired(db)
+            if purged:
+                logger.info("purged %d expired idempotency records", purged)
+        except Exception:
+            logger.exception("idempotency purge failed")
+        await asyncio.sleep(interval_s)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import Column
+
+from infra.db.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Promoted audit columns, filled from the JSON payload of events written
+# before they existed. Evaluations carry {"trade": {...}, "decision": {...}},
+# TRADE_CREATED events are the trade itself.
+BACKFILL_EVENTS = {
+    "postgresql": """
+        UPDATE events SET
+            book = COALESCE(payload->'trade'->>'book', payload->>'book'),
+            symbol = COALESCE(payload->'trade'->>'symbol', payload->>'symbol'),
+            decision_status = payload->'decision'->>'status',
+            reason_codes = payload->'decision'->'reasons',
+            trade_dv01 = (payload->>'trade_dv01')::double precision,
+            notional = (payload->>'trade_notional')::double precision
+        WHERE book IS NULL
+          AND COALESCE(payload->'trade'->>'book', payload->>'book') IS NOT NULL
+    """,
+    "sqlite": """
+        UPDATE events SET
+            book = COALESCE(json_extract(payload, '$.trade.book'), json_extract(payload, '$.book')),
+            symbol = COALESCE(
+                json_extract(payload, '$.trade.symbol'), json_extract(payload, '$.symbol')
+            ),
+            decision_status = json_extract(payload, '$.decision.status'),
+            reason_codes = json_extract(payload, '$.decision.reasons'),
+            trade_dv01 = json_extract(payload, '$.trade_dv01'),
+            notional = json_extract(payload, '$.trade_notional')
+        WHERE book IS NULL
+          AND COALESCE(json_extract(payload, '$.trade.book'), json_extract(payload, '$.book'))
+              IS NOT NULL
+    """,
+}
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Brings a database created by an older version up to the current models.
+    Run after create_all (which creates missing tables but never alters
+    existing ones); every step checks the live schema first, so it is a
+    no-op on an up-to-date database and safe to run on every start.
+
+    1) add missing columns  2) events.payload text -> jsonb (PostgreSQL)
+    3) backfill the promoted event columns  4) create missing indexes
+    """
+
+    with engine.begin() as conn:
+        dialect = conn.dialect.name
+        schema = inspect(conn)
+        existing = set(schema.get_table_names())
+
+        # 1) Columns added to tables that already existed
+        added = set()
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            have = {c["name"] for c in schema.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in have:
+                    _add_column(conn, table.name, column)
+                    added.add((table.name, column.name))
+
+        # 2) Audit payloads were JSON strings in a text column
+        if dialect == "postgresql" and "events" in existing:
+            payload = next(c for c in schema.get_columns("events") if c["name"] == "payload")
+            if not isinstance(payload["type"], JSONB):
+                _execute(
+                    conn,
+                    "ALTER TABLE events ALTER COLUMN payload TYPE jsonb USING payload::jsonb",
+                )
+
+        # 3) Only needed when the promoted columns were just added
+        if ("events", "book") in added and dialect in BACKFILL_EVENTS:
+            result = conn.execute(text(BACKFILL_EVENTS[dialect]))
+            logger.info("backfilled promoted columns on %d events", result.rowcount)
+
+        # 4) Indexes on tables create_all did not (re)create
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            have = {i["name"] for i in schema.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in have:
+                    logger.info("creating index %s", index.name)
+                    index.create(bind=conn)
+
+
+def _add_column(conn: Connection, table: str, column: Column) -> None:
+    ddl = f"ALTER TABLE {table} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+    if not column.nullable:
+        default = column.default.arg if column.default is not None else None
+        if default is None or callable(default):
+            raise RuntimeError(f"NOT NULL column {table}.{column.name} needs a scalar default")
+        ddl += f" NOT NULL DEFAULT {default!r}"
+    _execute(conn, ddl)
+
+
+def _execute(conn: Connection, ddl: str) -> None:
+    logger.info("schema upgrade: %s", ddl)
+    conn.execute(text(ddl))
@@ -3,11 +3,15 @@ from __future__ import annotations
 from datetime import datetime
 import uuid
 
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import JSON, Column, Date, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+# JSONB on PostgreSQL (indexable, queryable), plain JSON elsewhere (SQLite tests)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Trade(Base):
     __tablename__ = "trades"
@@ -19,15 +23,38 @@ class Trade(Base):
     book = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # delta risk runs read "trades in this book since <high-water mark>"
+    __table_args__ = (Index("ix_trades_book_created", "book", "created_at"),)
+
 
 class Event(Base):
     __tablename__ = "events"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     event_type = Column(String, nullable=False)
-    payload = Column(Text, nullable=False)  # store JSON string
+    payload = Column(JSONType, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # promoted from the payload so audit queries can filter in SQL
+    book = Column(String, nullable=True)
+    symbol = Column(String, nullable=True)
+    decision_status = Column(String, nullable=True)  # PASS | WARN | BLOCK (evaluations)
+    reason_codes = Column(JSONType, nullable=True)  # list of LIM_* codes
+    trade_dv01 = Column(Float, nullable=True)
+    notional = Column(Float, nullable=True)
+
+    # keyset pagination walks (created_at, id) descending, optionally per filter
+    __table_args__ = (
+        Index("ix_events_created_id", "created_at", "id"),
+        Index("ix_events_type_created_id", "event_type", "created_at", "id"),
+        Index("ix_events_book_created_id", "book", "created_at", "id"),
+        Index("ix_events_status_created_id", "decision_status", "created_at", "id"),
+        Index("ix_events_book_status_created", "book", "decision_status", "created_at"),
+        Index("ix_events_symbol_created_id", "symbol", "created_at", "id"),
+        Index("ix_events_reason_codes", "reason_codes", postgresql_using="gin"),
+    )
+
+
 class RiskRun(Base):
     __tablename__ = "risk_runs"
 
@@ -36,10 +63,72 @@ class RiskRun(Base):
     report = Column(Text, nullable=False)  # JSON string
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # delta runs: the run this one was built from, and the created_at of the
+    # newest trade included (trades after it are not in this run)
+    base_run_id = Column(String, nullable=True)
+    high_water_mark = Column(DateTime, nullable=True)
+    # ids of the included trades created within RISK_RUN_OVERLAP_S of the
+    # mark: the next delta re-reads that window and skips these
+    tail_trade_ids = Column(JSONType, nullable=True)
+
+    __table_args__ = (Index("ix_risk_runs_book_created", "book", "created_at"),)
+
+
+class Instrument(Base):
+    __tablename__ = "instruments"
+
+    symbol = Column(String, primary_key=True)
+    modified_duration = Column(Float, nullable=False)
+
+    # bond terms for curve pricing; without them the duration method is used
+    coupon = Column(Float, nullable=True)  # annual, % of face
+    maturity = Column(Date, nullable=True)
+    frequency = Column(Integer, nullable=False, default=2)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CurvePoint(Base):
+    __tablename__ = "curve_points"
+
+    tenor_years = Column(Float, primary_key=True)
+    zero_rate = Column(Float, nullable=False)  # continuously compounded, decimal
+
+
+class ReferenceVersion(Base):
+    __tablename__ = "reference_versions"
+
+    # one row per reference data set ("instruments": instruments + curve),
+    # bumped on every change
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class LimitRule(Base):
+    __tablename__ = "limits"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    level = Column(String, nullable=False)  # FIRM | DESK | BOOK | SYMBOL
+    desk = Column(String, nullable=True)  # DESK
+    book = Column(String, nullable=True)  # BOOK; SYMBOL (null: the symbol in any book)
+    symbol = Column(String, nullable=True)  # SYMBOL
+    metric = Column(String, nullable=False)  # trade_notional | book_dv01 | bucket_dv01_10Y | ...
+    warn = Column(Float, nullable=True)  # soft threshold: WARN
+    block = Column(Float, nullable=True)  # hard threshold: BLOCK
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class BookDesk(Base):
+    __tablename__ = "book_desks"
+
+    book = Column(String, primary_key=True)
+    desk = Column(String, nullable=False)
+
 
 class IdempotencyRecord(Base):
     __tablename__ = "idempotency_records"
 
     key = Column(String, primary_key=True)
     response = Column(Text, nullable=False)  # store JSON string
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Generic, Protocol, TypeVar, cast
+
+from sqlalchemy import CursorResult, Select, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from infra.db.models import ReferenceVersion
+from infra.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class Versioned(Protocol):
+    # read-only, so frozen dataclasses satisfy it
+    @property
+    def version(self) -> int: ...
+
+
+T = TypeVar("T", bound=Versioned)
+
+
+class VersionedStore(ABC, Generic[T]):
+    """
+    Holds the current snapshot of some reference data, versioned by its
+    `reference_versions` row. Readers take `current` once and use it for the
+    whole calculation; a change builds a new snapshot and swaps it in with
+    one assignment, so nobody sees half of an update. Other workers pick a
+    change up on their next poll.
+
+    Subclasses say what the data is (`name`, `_build`, `_build_async`); the
+    version row, swapping and polling live here.
+    """
+
+    name: str  # reference_versions row
+    label: str  # for logs
+    poll_interval_s: float
+
+    def __init__(self, initial: T) -> None:
+        self._current = initial
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[T], None]] = []
+
+    @property
+    def current(self) -> T:
+        return self._current
+
+    def on_swap(self, listener: Callable[[T], None]) -> None:
+        self._listeners.append(listener)
+
+    def swap(self, snapshot: T) -> bool:
+        with self._lock:
+            if self._same(snapshot, self._current):
+                return False
+            self._current = snapshot
+            for listener in self._listeners:
+                listener(snapshot)
+        logger.info("%s v%d loaded (%s)", self.label, snapshot.version, self._describe(snapshot))
+        return True
+
+    def _same(self, a: T, b: T) -> bool:
+        # a version identifies its data: same version, nothing to swap
+        return a.version == b.version
+
+    def load(self, db: Session) -> T:
+        version = db.scalar(self._version_stmt()) or 0
+        self.swap(self._build(db, version))
+        return self._current
+
+    async def load_async(self, db: AsyncSession) -> T:
+        version = await db.scalar(self._version_stmt()) or 0
+        self.swap(await self._build_async(db, version))
+        return self._current
+
+    def _seed_version(self, db: Session) -> None:
+        if db.get(ReferenceVersion, self.name) is None:
+            db.add(ReferenceVersion(name=self.name, version=1))
+
+    async def _commit_and_reload(self, db: AsyncSession) -> T:
+        """
+        Bumps the version in the caller's transaction, commits and reloads.
+        """
+
+        now = datetime.utcnow()
+        bumped = cast(
+            CursorResult[Any],
+            await db.execute(
+                update(ReferenceVersion)
+                .where(ReferenceVersion.name == self.name)
+                .values(version=ReferenceVersion.version + 1, updated_at=now)
+            ),
+        )
+        if not bumped.rowcount:
+            db.add(ReferenceVersion(name=self.name, version=1, updated_at=now))
+        await db.commit()
+        return await self.load_async(db)
+
+    async def poll_loop(self, interval_s: float | None = None) -> None:
+        """
+        Background task: reloads when another writer has bumped the version.
+        """
+
+        while True:
+            await asyncio.sleep(self.poll_interval_s if interval_s is None else interval_s)
+            try:
+                async with AsyncSessionLocal() as db:
+                    version = await db.scalar(self._version_stmt()) or 0
+                    if version != self._current.version:
+                        await self.load_async(db)
+            except Exception:
+                logger.exception("%s poll failed", self.label)
+
+    def _version_stmt(self) -> Select[int]:
+        return select(ReferenceVersion.version).where(ReferenceVersion.name == self.name)
+
+    @abstractmethod
+    def _build(self, db: Session, version: int) -> T:
+        """Reads the data and builds the snapshot at `version`."""
+
+    @abstractmethod
+    async def _build_async(self, db: AsyncSession, version: int) -> T:
+        """Reads the data and builds the snapshot at `version`."""
+
+    @abstractmethod
+    def _describe(self, snapshot: T) -> str:
+        """Size of a snapshot for the load log line, e.g. "3 instruments"."""
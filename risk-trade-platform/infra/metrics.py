@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+from infra.db.session import ASYNC_POOL_STATS, POOL_STATS, pool_status
+
+# Latency buckets (seconds): sub-millisecond cache hits up to slow commits
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple[str, ...]
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Sample lines in the exposition format, after the header."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+
+
+class Histogram(_Metric):
+    """
+    Fixed buckets, one observation = one bisect + three adds under a lock.
+    Counts are kept per bucket and made cumulative only when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+
+        lines = []
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                le = _labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Read at scrape time from `collect` (e.g. pool occupancy), so nothing is
+    recorded on the request path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels,
+        collect: Callable[[], Iterable[tuple[Labels, float]]],
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in self._collect()
+        ]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines += metric.header()
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Labels, values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Labels = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(name: str, help: str, labelnames: Labels = ()) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames))  # type: ignore[return-value]
+
+
+# HTTP
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "Time to response headers, by route template",
+    ("method", "route", "status"),
+)
+
+# Pre-trade path
+TRADE_STAGE_SECONDS = histogram(
+    "trade_stage_duration_seconds",
+    "POST /trades time per stage (idempotency, dv01, lock_wait, book_dv01, limits, commit, audit)",
+    ("stage",),
+)
+TRADE_DECISIONS = counter("trade_decisions_total", "Limit decisions by status", ("status",))
+TRADE_REASONS = counter("trade_decision_reasons_total", "Limit decision reason codes", ("reason",))
+AUDIT_EVENTS_SPILLED = counter(
+    "audit_events_spilled_total", "Audit events spilled to disk by a failed group-mode flush"
+)
+AUDIT_EVENTS_DROPPED = counter(
+    "audit_events_dropped_total", "Audit events lost to a failed group-mode flush and spill"
+)
+
+
+# DB connection pools (per worker process)
+def _pool_gauge(key: str) -> Callable[[], list[tuple[Labels, float]]]:
+    def collect() -> list[tuple[Labels, float]]:
+        status = pool_status()
+        return [((name,), s[key]) for name, s in status.items() if key in s]
+
+    return collect
+
+
+def _pool_stat(attr: str) -> Callable[[], list[tuple[Labels, float]]]:
+    def collect() -> list[tuple[Labels, float]]:
+        return [
+            (("sync",), getattr(POOL_STATS, attr)),
+            (("async",), getattr(ASYNC_POOL_STATS, attr)),
+        ]
+
+    return collect
+
+
+for _key, _help in (
+    ("size", "Configured pool size"),
+    ("checked_out", "Connections currently checked out"),
+    ("checked_in", "Idle connections in the pool"),
+    ("overflow", "Current overflow connections"),
+):
+    REGISTRY.register(CallbackMetric(f"db_pool_{_key}", _help, ("engine",), _pool_gauge(_key)))
+
+for _attr, _name, _help in (
+    ("checkouts", "db_pool_checkouts_total", "Connection checkouts"),
+    ("timeouts", "db_pool_checkout_timeouts_total", "Checkouts that timed out"),
+    ("wait_total_s", "db_pool_checkout_wait_seconds_total", "Time spent waiting for a connection"),
+):
+    REGISTRY.register(
+        CallbackMetric(_name, _help, ("engine",), _pool_stat(_attr), kind="counter")
+    )
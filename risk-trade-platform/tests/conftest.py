@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# API tests run against a throwaway SQLite file; set before the app (and its
+# engines) are imported. No background polling during tests.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("REFERENCE_POLL_INTERVAL_S", "0")
+os.environ.setdefault("LIMITS_POLL_INTERVAL_S", "0")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """
+    The app on a fresh database, started up (seeded reference data and
+    limits, warmed position cache) and shut down around the test.
+    """
+
+    from apps.api.main import app
+    from infra.db.models import Base
+    from infra.db.session import engine
+
+    Base.metadata.drop_all(bind=engine)
+    with TestClient(app) as c:
+        yield c
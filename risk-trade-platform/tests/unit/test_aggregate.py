@@ -0,0 +1,30 @@
+from core.risk import bond
+from core.risk.aggregate import positions_dv01
+from core.risk.dv01 import calculate_bond_dv01
+from core.risk.reference import REFERENCE
+
+# (book, symbol, trade_count, net_quantity, gross quantity * price)
+POSITIONS = [
+    ("RATES", "UKT10Y", 2, 1_000_000.0, 99_250_000.0),
+    ("CREDIT", "UKT10Y", 1, 1_000_000.0, 99_250_000.0),
+]
+
+
+def test_positions_dv01_prices_each_book_by_its_method(monkeypatch) -> None:
+    monkeypatch.setitem(bond.BOOK_PRICING, "RATES", "curve")
+
+    risk = positions_dv01(POSITIONS)
+    rates, credit = risk["breakdown"]
+
+    assert rates["method"] == "curve"
+    assert credit["method"] == "duration"
+    assert rates["dv01"] == calculate_bond_dv01("UKT10Y", 1_000_000, 99.25, book="RATES").dv01
+    assert credit["dv01"] == calculate_bond_dv01("UKT10Y", 1_000_000, 99.25).dv01
+    assert risk["portfolio_dv01"] == rates["dv01"] + credit["dv01"]
+    assert risk["reference_version"] == REFERENCE.current.version
+
+
+def test_positions_dv01_empty() -> None:
+    risk = positions_dv01([])
+    assert risk["portfolio_dv01"] == 0.0
+    assert risk["breakdown"] == []
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from infra.db.models import Trade
+from infra.db.session import SessionLocal
+
+BOOK = "ASOF"
+
+
+def _as_of(client, ts: datetime) -> dict:
+    response = client.get("/risk/as-of", params={"book": BOOK, "ts": ts.isoformat()})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _net(report: dict) -> dict[str, float]:
+    return {p["symbol"]: p["net_quantity"] for p in report["risk"].get("breakdown", [])}
+
+
+def test_as_of_includes_only_trades_booked_by_then(client) -> None:
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        for hours, symbol, quantity in ((3, "UKT5Y", 100_000), (2, "UKT10Y", 200_000), (1, "UKT5Y", 50_000)):
+            db.add(
+                Trade(
+                    book=BOOK,
+                    symbol=symbol,
+                    quantity=quantity,
+                    price=100.0,
+                    created_at=now - timedelta(hours=hours),
+                )
+            )
+        db.commit()
+
+    assert _as_of(client, now - timedelta(hours=4))["trade_count"] == 0
+    before = _as_of(client, now - timedelta(minutes=90))
+    assert _net(before) == {"UKT5Y": 100_000, "UKT10Y": 200_000}
+    assert before["base_run_id"] is None
+
+    # a run now, then a later trade: as-of after the run starts from it
+    run_id = client.post("/risk-runs", params={"book": BOOK}).json()["run_id"]
+    trade = {"book": BOOK, "symbol": "UKT30Y", "quantity": 10_000, "price": 100.0}
+    assert client.post("/trades/", json=trade).status_code == 200
+
+    later = _as_of(client, datetime.utcnow() + timedelta(minutes=1))
+    assert later["base_run_id"] == run_id
+    assert _net(later) == {"UKT5Y": 150_000, "UKT10Y": 200_000, "UKT30Y": 10_000}
+    assert later["trade_count"] == 4
+
+    # the run is after this timestamp, so it is not used
+    again = _as_of(client, now - timedelta(minutes=90))
+    assert (again["base_run_id"], _net(again)) == (None, _net(before))
+
+    # a zoned timestamp is the same instant in UTC
+    zoned = (now - timedelta(minutes=90)).replace(tzinfo=timezone.utc)
+    zoned = zoned.astimezone(timezone(timedelta(hours=-5)))
+    assert _net(_as_of(client, zoned)) == _net(before)
@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from infra.db.audit import AuditWriter
+from infra.db.models import Event
+from infra.db.session import AsyncSessionLocal
+from infra.metrics import AUDIT_EVENTS_DROPPED, AUDIT_EVENTS_SPILLED
+
+
+def _request(writer: AuditWriter, book: str) -> SimpleNamespace:
+    # group mode only keeps pending rows on the session's info dict
+    db = SimpleNamespace(info={})
+    writer.record(db, "TRADE_EVALUATED", {"book": book}, book=book)
+    writer.record(db, "TRADE_CREATED", {"book": book}, book=book)
+    return db
+
+
+async def _event_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count(Event.id)))
+
+
+def _spy_flushes(monkeypatch, writer: AuditWriter) -> list[int]:
+    sizes: list[int] = []
+    flush = writer._flush
+
+    async def spy(batch):
+        sizes.append(sum(len(rows) for rows, _ in batch))
+        await flush(batch)
+
+    monkeypatch.setattr(writer, "_flush", spy)
+    return sizes
+
+
+def test_group_mode_batches_concurrent_requests(client, monkeypatch) -> None:
+    writer = AuditWriter("group", batch_size=500, flush_interval_s=0.05)
+    flushes = _spy_flushes(monkeypatch, writer)
+
+    async def scenario() -> int:
+        before = await _event_count()
+        await asyncio.gather(*(writer.committed(_request(writer, f"B{i}")) for i in range(5)))
+        await writer.stop()
+        return await _event_count() - before
+
+    assert client.portal.call(scenario) == 10
+    assert flushes == [10]
+
+
+def test_group_mode_flushes_on_shutdown(client, monkeypatch) -> None:
+    # a flush interval far longer than the test: only stop() can write the batch
+    writer = AuditWriter("group", batch_size=500, flush_interval_s=60)
+    flushes = _spy_flushes(monkeypatch, writer)
+
+    async def scenario() -> int:
+        before = await _event_count()
+        pending = [asyncio.create_task(writer.committed(_request(writer, "B"))) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert not any(t.done() for t in pending)
+
+        await writer.stop()
+        await asyncio.wait_for(asyncio.gather(*pending), 1)
+        return await _event_count() - before
+
+    assert client.portal.call(scenario) == 6
+    assert flushes == [6]
+
+
+def test_failed_flush_spills_then_recovers(client, monkeypatch, tmp_path) -> None:
+    spill = tmp_path / "spill.jsonl"
+    writer = AuditWriter("group", flush_interval_s=0.01, retries=1, spill_path=str(spill))
+    insert = writer._insert
+
+    async def broken(rows):
+        raise RuntimeError("database down")
+
+    async def scenario() -> tuple[int, int]:
+        before = await _event_count()
+        monkeypatch.setattr(writer, "_insert", broken)
+        spilled = AUDIT_EVENTS_SPILLED.value()
+        await writer.committed(_request(writer, "SPILL"))  # the request still completes
+        assert AUDIT_EVENTS_SPILLED.value() == spilled + 2
+        assert await _event_count() == before
+
+        monkeypatch.setattr(writer, "_insert", insert)
+        recovered = await writer.recover()
+        await writer.stop()
+        return recovered, await _event_count() - before
+
+    assert client.portal.call(scenario) == (2, 2)
+    assert not spill.exists()
+
+
+def test_failed_flush_without_spill_drops(client, monkeypatch) -> None:
+    writer = AuditWriter("group", flush_interval_s=0.01, retries=0, spill_path="")
+
+    async def broken(rows):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(writer, "_insert", broken)
+    dropped = AUDIT_EVENTS_DROPPED.value()
+
+    async def scenario() -> None:
+        await writer.committed(_request(writer, "DROP"))
+        await writer.stop()
+
+    client.portal.call(scenario)
+    assert AUDIT_EVENTS_DROPPED.value() == dropped + 2
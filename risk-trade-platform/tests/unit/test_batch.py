@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import event
+
+from core.risk.dv01 import calculate_bond_dv01
+from infra.db.session import async_engine
+
+UNIT = {"symbol": "UKT10Y", "quantity": 100_000, "price": 100.0}
+DV01 = calculate_bond_dv01(UNIT["symbol"], UNIT["quantity"], UNIT["price"]).dv01
+
+
+def _trade(book: str, size: float = 1, symbol: str = "UKT10Y") -> dict:
+    return {**UNIT, "book": book, "symbol": symbol, "quantity": UNIT["quantity"] * size}
+
+
+def test_batch_runs_each_book_in_input_order(client) -> None:
+    # room for 3.5 units of DV01 in B1; B2 has no limits (WARN, but allowed)
+    limit = {"level": "BOOK", "book": "B1", "metric": "book_dv01", "block": 3.5 * DV01}
+    assert client.put("/api/limits", json={"rules": [limit]}).status_code == 200
+
+    trades = [
+        _trade("B1"),
+        _trade("B2"),
+        _trade("B1"),
+        _trade("B1", size=2),  # 2 -> 4 units: blocked
+        _trade("B1"),  # still sees 2 units, not 4
+        _trade("B1", symbol="NOPE"),
+        _trade("B2"),
+    ]
+
+    commits: list[object] = []
+
+    def on_commit(conn) -> None:
+        commits.append(conn)
+
+    event.listen(async_engine.sync_engine, "commit", on_commit)
+    try:
+        response = client.post("/trades/batch", json={"trades": trades})
+    finally:
+        event.remove(async_engine.sync_engine, "commit", on_commit)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["accepted"], body["blocked"], body["errors"]) == (5, 1, 1)
+    assert len(commits) == 1  # every trade and audit event in one transaction
+
+    results = body["results"]
+    assert [r["index"] for r in results] == list(range(len(trades)))
+    statuses = [r["status"] for r in results]
+    assert statuses == ["PASS", "WARN", "PASS", "BLOCK", "PASS", "ERROR", "WARN"]
+    assert "NOPE" in results[5]["error"]
+    assert results[3]["reasons"] == ["LIM_BOOK_DV01_EXCEEDED"]
+
+    before = [r.get("book_dv01_before") for r in results]
+    expected = [0, 0, 1, 2, 2, None, 1]
+    for got, units in zip(before, expected):
+        assert got == (None if units is None else pytest.approx(units * DV01))
+
+    for book, units in (("B1", 3), ("B2", 2)):
+        check = client.post("/risk/positions/verify", params={"book": book}).json()
+        assert check["consistent"]
+        assert check["recomputed_dv01"] == pytest.approx(units * DV01)
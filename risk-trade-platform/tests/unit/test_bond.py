@@ -0,0 +1,42 @@
+import numpy as np
+
+from core.risk.bond import ZeroCurve, bond_prices, bump_dv01, key_rate_dv01
+
+FLAT_5PCT = ZeroCurve(tenors=np.array([1.0, 30.0]), rates=np.array([0.05, 0.05]))
+
+
+def test_zero_coupon_dv01_matches_closed_form() -> None:
+    dv01 = bump_dv01(np.array([0.0]), np.array([10.0]), np.array([2.0]), FLAT_5PCT)
+    # P = 100 e^{-rT}, dP/dr = -T P
+    assert np.isclose(dv01[0], 10.0 * 100 * np.exp(-0.5) * 0.0001, rtol=1e-6)
+
+
+def test_vectorised_pricing_matches_bond_by_bond() -> None:
+    rng = np.random.default_rng(3)
+    coupons = rng.uniform(0, 8, 200)
+    maturities = rng.uniform(-1, 40, 200)  # includes matured bonds
+    frequencies = rng.choice([1.0, 2.0, 4.0], 200)
+
+    prices = bond_prices(coupons, maturities, frequencies, FLAT_5PCT)
+    one_by_one = [
+        bond_prices(coupons[i : i + 1], maturities[i : i + 1], frequencies[i : i + 1], FLAT_5PCT)[0]
+        for i in range(200)
+    ]
+
+    assert np.allclose(prices, one_by_one, rtol=0, atol=1e-9)
+    assert (prices[maturities <= 0] == 0).all()
+
+
+def test_key_rate_ladder_adds_up_to_parallel_dv01() -> None:
+    coupons = np.array([0.0, 4.0, 4.5, 4.25])
+    maturities = np.array([1.5, 5.0, 9.7, 28.0])
+    frequencies = np.array([2.0, 2.0, 2.0, 1.0])
+
+    ladder = key_rate_dv01(coupons, maturities, frequencies, FLAT_5PCT)
+    parallel = bump_dv01(coupons, maturities, frequencies, FLAT_5PCT)
+
+    # triangular bumps sum to a parallel shift (up to second-order terms)
+    assert np.allclose(ladder.sum(axis=1), parallel, rtol=1e-6)
+    # a bond inside the first key tenor only moves with that key
+    assert np.isclose(ladder[0, 0], parallel[0])
+    assert (ladder[0, 1:] == 0).all()
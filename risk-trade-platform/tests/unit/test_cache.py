@@ -0,0 +1,50 @@
+TRADE = {"book": "RATES", "symbol": "UKT10Y", "quantity": 100_000, "price": 100.0}
+
+
+def _revalidate(client, url: str) -> tuple[str, int]:
+    """
+    ETag of a fresh GET, then the status of a conditional GET right after.
+    """
+
+    etag = client.get(url).headers["ETag"]
+    return etag, client.get(url, headers={"If-None-Match": etag}).status_code
+
+
+def test_risk_run_etag(client) -> None:
+    run_id = client.post("/risk-runs", params={"book": "RATES"}).json()["run_id"]
+
+    etag, status = _revalidate(client, f"/risk-runs/{run_id}")
+    assert status == 304
+
+    # an unknown run is a 404 whatever the client sends
+    missing = client.get("/risk-runs/missing", headers={"If-None-Match": "*"})
+    assert missing.status_code == 404
+    missing = client.get("/risk-runs/missing", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+
+def test_trade_invalidates_summaries(client) -> None:
+    client.post("/trades/", json=TRADE)
+
+    for url in ("/api/summary", "/risk/summary"):
+        etag, status = _revalidate(client, url)
+        assert status == 304
+
+        client.post("/trades/", json=TRADE)
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+def test_limits_put_invalidates_limits(client) -> None:
+    etag, status = _revalidate(client, "/api/limits")
+    assert status == 304
+
+    rule = {"level": "BOOK", "book": "RATES", "metric": "book_dv01", "block": 5_000.0}
+    assert client.put("/api/limits", json={"rules": [rule]}).status_code == 200
+
+    response = client.get("/api/limits", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    rules = response.json()["books"]["RATES"]["rules"]
+    assert {"metric": "book_dv01", "level": "BOOK", "warn": None, "block": 5_000.0} in rules
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from core.risk import bond
+from core.risk.aggregate import positions_dv01
+from core.risk.columnar import (
+    blend_curve_dv01,
+    columnar_dv01,
+    curve_dv01_table,
+    duration_table,
+    encode_symbols,
+)
+from core.risk.reference import REFERENCE, build_index
+
+# (book, symbol, quantity, price): each trade is also its own one-trade position
+TRADES = [
+    ("RATES", "UKT10Y", 1_000_000.0, 99.25),
+    ("CREDIT", "UKT10Y", -250_000.0, 101.5),
+    ("RATES", "UKT5Y", 500_000.0, 100.0),
+    ("CREDIT", "UKT30Y", 2_000_000.0, 95.0),
+]
+
+
+def _columnar(trades: list[tuple]) -> tuple[np.ndarray, np.ndarray]:
+    books, symbols, quantities, prices = zip(*trades)
+    distinct, codes = encode_symbols(symbols)
+    qty = np.asarray(quantities)
+    notional, dv01 = columnar_dv01(codes, qty, np.asarray(prices), duration_table(distinct))
+
+    book_names, book_codes = encode_symbols(books)
+    curve_books = np.array([bond.pricing_method(b) == "curve" for b in book_names])
+    dv01 = blend_curve_dv01(codes, qty, dv01, curve_dv01_table(distinct), curve_books[book_codes])
+    return notional, dv01
+
+
+def _positions(trades: list[tuple]) -> list[dict]:
+    rows = [(b, s, 1, q, q * p) for b, s, q, p in trades]
+    return positions_dv01(rows)["breakdown"]
+
+
+@pytest.mark.parametrize("rates_pricing", ["duration", "curve"])
+def test_columnar_matches_positions_dv01(monkeypatch, rates_pricing: str) -> None:
+    monkeypatch.setitem(bond.BOOK_PRICING, "RATES", rates_pricing)
+
+    notional, dv01 = _columnar(TRADES)
+    expected = _positions(TRADES)
+
+    assert notional.tolist() == pytest.approx([p["notional"] for p in expected])
+    assert dv01.tolist() == pytest.approx([p["dv01"] for p in expected])
+    methods = {p["book"]: p["method"] for p in expected}
+    assert methods == {"RATES": rates_pricing, "CREDIT": "duration"}
+
+
+def test_curve_book_without_bond_terms_falls_back_to_duration(monkeypatch) -> None:
+    monkeypatch.setitem(bond.BOOK_PRICING, "RATES", "curve")
+    # durations only: no coupon / maturity to reprice off the curve
+    durations = build_index(-1, list(REFERENCE.current.durations.items()))
+    monkeypatch.setattr(REFERENCE, "_current", durations)
+
+    _, dv01 = _columnar([("RATES", "UKT10Y", 1_000_000.0, 100.0)])
+    (expected,) = _positions([("RATES", "UKT10Y", 1_000_000.0, 100.0)])
+    assert expected["method"] == "duration"
+    assert dv01.tolist() == pytest.approx([expected["dv01"]])
+
+
+@pytest.mark.parametrize("book", ["CREDIT", "RATES"])
+def test_unknown_symbol(monkeypatch, book: str) -> None:
+    monkeypatch.setitem(bond.BOOK_PRICING, "RATES", "curve")
+    trades = [(book, "UKT10Y", 1_000_000.0, 100.0), (book, "NOPE", 1_000_000.0, 100.0)]
+
+    # columnar marks the row NaN and prices the rest; per position it is an error
+    _, dv01 = _columnar(trades)
+    assert np.isnan(dv01[1])
+    assert dv01[0] == pytest.approx(_positions(trades[:1])[0]["dv01"])
+    with pytest.raises(ValueError, match="NOPE"):
+        _positions(trades)
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+TRADES = [
+    {"book": "RATES", "symbol": "UKT10Y", "quantity": 100_000, "price": 99.0},
+    {"book": "RATES", "symbol": "UKT5Y", "quantity": 100_000, "price": 101.0},
+    {"book": "RATES", "symbol": "UKT10Y", "quantity": 50_000_000, "price": 99.0},  # BLOCK
+    {"book": "CREDIT", "symbol": "UKT30Y", "quantity": 100_000, "price": 95.0},
+    {"book": "CREDIT", "symbol": "UKT5Y", "quantity": 100_000, "price": 101.0},
+]
+
+
+def _book_trades(client) -> list[dict]:
+    for trade in TRADES:
+        client.post("/trades/", json=trade)
+    return client.get("/events/", params={"limit": 500}).json()
+
+
+def _pages(client, limit: int, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/events/", params=query)
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_every_event_once(client) -> None:
+    events = _book_trades(client)
+    assert len(events) == 9  # 5 evaluations + 4 accepted trades
+
+    keys = [(e["created_at"], e["id"]) for e in events]
+    assert keys == sorted(keys, reverse=True)
+
+    for limit in (1, 2, 3, 9):
+        pages = _pages(client, limit)
+        assert all(len(p) <= limit for p in pages)
+        assert [e["id"] for p in pages for e in p] == [e["id"] for e in events]
+
+    # a full last page still hands out a cursor, which then reads an empty page
+    assert _pages(client, 9)[-1] == []
+
+
+def test_event_filters(client) -> None:
+    events = _book_trades(client)
+
+    def ids(**params) -> set[int]:
+        return {e["id"] for e in client.get("/events/", params={"limit": 500, **params}).json()}
+
+    assert ids(book="CREDIT") == {e["id"] for e in events if e["book"] == "CREDIT"}
+    assert ids(symbol="UKT5Y") == {e["id"] for e in events if e["symbol"] == "UKT5Y"}
+    assert ids(event_type="TRADE_CREATED") == {
+        e["id"] for e in events if e["event_type"] == "TRADE_CREATED"
+    }
+    blocked = {e["id"] for e in events if e["decision_status"] == "BLOCK"}
+    assert len(blocked) == 1
+    assert ids(status="BLOCK") == blocked
+    assert ids(reason="LIM_TRADE_NOTIONAL_EXCEEDED") == blocked
+    assert ids(book="CREDIT", status="BLOCK") == set()
+
+    # filters combine with pagination
+    pages = _pages(client, 2, book="RATES")
+    assert [e["id"] for p in pages for e in p] == [e["id"] for e in events if e["book"] == "RATES"]
+
+
+def test_time_window_accepts_zoned_timestamps(client) -> None:
+    events = _book_trades(client)
+    # split between two events with distinct timestamps
+    split = next(i for i in range(4, 8) if events[i]["created_at"] > events[i + 1]["created_at"])
+    at = datetime.fromisoformat(events[split]["created_at"])  # naive UTC
+
+    newer = {e["id"] for e in events[: split + 1]}
+    older = {e["id"] for e in events[split + 1 :]}
+
+    for since in (
+        at.isoformat(),
+        at.isoformat() + "Z",
+        (at + timedelta(hours=1)).isoformat() + "+01:00",
+    ):
+        got = client.get("/events/", params={"limit": 500, "since": since})
+        assert got.status_code == 200
+        assert {e["id"] for e in got.json()} == newer
+
+    until = (at - timedelta(hours=5)).isoformat() + "-05:00"
+    assert {e["id"] for e in client.get("/events/", params={"until": until}).json()} == older
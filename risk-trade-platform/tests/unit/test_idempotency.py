@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from infra.db import idempotency
+from infra.db.idempotency import (
+    IDEMPOTENCY_CACHE,
+    IdempotencyCache,
+    lookup_response,
+    purge_expired,
+)
+from infra.db.models import IdempotencyRecord, Trade
+from infra.db.session import AsyncSessionLocal
+
+TRADE = {"book": "RATES", "symbol": "UKT5Y", "quantity": 100_000, "price": 100.0}
+
+
+class NoDatabase:
+    def __getattr__(self, name: str):
+        raise AssertionError(f"unexpected DB access: {name}")
+
+
+def test_cache_is_lru_with_expiry(monkeypatch) -> None:
+    now = [1_000.0]
+    monkeypatch.setattr(idempotency.time, "monotonic", lambda: now[0])
+
+    cache = IdempotencyCache(max_size=2)
+    cache.put("a", "A", ttl_s=60)
+    cache.put("b", "B", ttl_s=60)
+    assert cache.get("a") == "A"  # a is now the most recently used
+    cache.put("c", "C", ttl_s=10)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+
+    now[0] += 10
+    assert cache.get("c") is None
+    assert len(cache) == 1
+
+
+def test_replay_is_served_from_cache(client) -> None:
+    headers = {"Idempotency-Key": "replay-1"}
+    first = client.post("/trades/", json=TRADE, headers=headers)
+    assert first.status_code == 200
+
+    # the write-through entry answers without touching the session
+    cached = client.portal.call(lookup_response, NoDatabase(), "replay-1")
+    assert cached == first.json()
+
+    second = client.post("/trades/", json=TRADE, headers=headers)
+    assert second.json() == first.json()
+
+    async def trade_count() -> int:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(func.count(Trade.id)))
+
+    assert client.portal.call(trade_count) == 1
+
+
+def _record(key: str, age: timedelta) -> IdempotencyRecord:
+    return IdempotencyRecord(
+        key=key, response=json.dumps({"key": key}), created_at=datetime.utcnow() - age
+    )
+
+
+def test_expired_record_is_deleted_on_lookup(client) -> None:
+    IDEMPOTENCY_CACHE.clear()
+
+    async def scenario() -> tuple[dict | None, dict | None, bool]:
+        async with AsyncSessionLocal() as db:
+            db.add_all([_record("old", timedelta(days=2)), _record("new", timedelta(hours=1))])
+            await db.commit()
+
+            old = await lookup_response(db, "old")
+            new = await lookup_response(db, "new")
+            await db.commit()
+            return old, new, await db.get(IdempotencyRecord, "old") is None
+
+    old, new, deleted = client.portal.call(scenario)
+    assert old is None and deleted
+    assert new == {"key": "new"}
+    assert IDEMPOTENCY_CACHE.get("new") is not None  # cached for the rest of its window
+
+
+def test_purge_removes_only_expired_records(client) -> None:
+    async def scenario() -> tuple[int, list[str]]:
+        async with AsyncSessionLocal() as db:
+            db.add_all(
+                [
+                    _record("expired-1", timedelta(hours=25)),
+                    _record("expired-2", timedelta(days=7)),
+                    _record("live", timedelta(hours=23)),
+                ]
+            )
+            await db.commit()
+            purged = await purge_expired(db)
+            keys = (await db.scalars(select(IdempotencyRecord.key))).all()
+            return purged, sorted(keys)
+
+    assert client.portal.call(scenario) == (2, ["live"])
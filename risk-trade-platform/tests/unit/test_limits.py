@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from core.controls.limits import build_limit_set, evaluate_limits
+
+
+def _row(level: str, metric: str, warn=None, block=None, desk=None, book=None, symbol=None):
+    return SimpleNamespace(
+        level=level, metric=metric, warn=warn, block=block, desk=desk, book=book, symbol=symbol
+    )
+
+
+LIMIT_SET = build_limit_set(
+    7,
+    [
+        _row("FIRM", "book_dv01", warn=800, block=1_000),
+        _row("DESK", "book_dv01", block=500, desk="GILTS"),
+        _row("BOOK", "book_dv01", block=200, book="RATES"),
+        _row("SYMBOL", "symbol_dv01", block=100, symbol="UKT30Y"),
+        _row("SYMBOL", "symbol_dv01", block=300, book="CREDIT", symbol="UKT30Y"),
+    ],
+    {"RATES": "GILTS", "LINKERS": "GILTS"},
+)
+
+
+def _check(book: str, book_dv01: float, symbol: str | None = None, symbol_dv01: float = 0.0):
+    return evaluate_limits(
+        book,
+        trade_notional=0.0,
+        trade_dv01=0.0,
+        current_book_dv01=book_dv01,
+        symbol=symbol,
+        current_symbol_dv01=symbol_dv01,
+        limit_set=LIMIT_SET,
+    )
+
+
+def test_most_specific_level_wins() -> None:
+    # BOOK over DESK over FIRM
+    assert _check("RATES", 250).status == "BLOCK"
+    assert _check("LINKERS", 250).status == "PASS"
+    assert _check("LINKERS", 600).status == "BLOCK"
+    assert _check("CREDIT", 600).status == "PASS"
+    assert _check("CREDIT", 1_200).reasons == ["LIM_BOOK_DV01_EXCEEDED"]
+
+    levels = {b: LIMIT_SET.for_book(b).rules[0].level for b in ("RATES", "LINKERS", "CREDIT")}
+    assert levels == {"RATES": "BOOK", "LINKERS": "DESK", "CREDIT": "FIRM"}
+
+
+def test_symbol_rules_apply_across_books() -> None:
+    # the any-book rule covers every book without one of its own
+    for book in ("RATES", "LINKERS", "NEWBOOK"):
+        decision = _check(book, 0, symbol="UKT30Y", symbol_dv01=150)
+        assert decision.reasons == ["LIM_SYMBOL_DV01_EXCEEDED"]
+    assert _check("CREDIT", 0, symbol="UKT30Y", symbol_dv01=150).status == "PASS"
+    assert _check("CREDIT", 0, symbol="UKT30Y", symbol_dv01=350).status == "BLOCK"
+    assert _check("RATES", 0, symbol="UKT10Y", symbol_dv01=150).status == "PASS"
+
+
+def test_warn_below_block() -> None:
+    warn = _check("CREDIT", 900)
+    assert (warn.status, warn.reasons, warn.limits_version) == ("WARN", ["LIM_BOOK_DV01_WARN"], 7)
+
+    # a hard breach reports only the block reason for that rule
+    assert _check("CREDIT", 1_100).reasons == ["LIM_BOOK_DV01_EXCEEDED"]
+
+    # warn from one rule alongside a block from another
+    both = _check("CREDIT", 900, symbol="UKT30Y", symbol_dv01=350)
+    assert both.status == "BLOCK"
+    assert both.reasons == ["LIM_SYMBOL_DV01_EXCEEDED", "LIM_BOOK_DV01_WARN"]
+
+
+def test_no_rules_warns() -> None:
+    empty = build_limit_set(1, [], {})
+    decision = evaluate_limits("RATES", 0.0, 0.0, 0.0, limit_set=empty)
+    assert (decision.status, decision.reasons) == ("WARN", ["NO_LIMITS_CONFIGURED"])
@@ -0,0 +1,64 @@
+import json
+
+from apps.api.live import publish_trade_updates
+from apps.api.routes import live_api
+from apps.api.routes.live_api import live_stream
+from core.risk.dv01 import calculate_bond_dv01
+from core.risk.positions import POSITIONS
+from infra.db.session import pool_status
+
+
+def _data(frame: str) -> dict:
+    return json.loads(frame.strip().split("\n")[1].removeprefix("data: "))
+
+
+def test_stream_returns_its_connection_after_the_snapshot(client) -> None:
+    client.post("/trades/", json={"book": "RATES", "symbol": "UKT5Y", "quantity": 1, "price": 100})
+
+    # TestClient reads a response to the end and this one never ends, so the
+    # stream is driven directly, on the app's event loop
+    async def first_frame() -> tuple[str, int]:
+        response = await live_stream()
+        try:
+            frame = await anext(response.body_iterator)
+            # the stream stays open, the pooled connection does not
+            return frame, pool_status()["async"]["checked_out"]
+        finally:
+            await response.body_iterator.aclose()
+
+    frame, checked_out = client.portal.call(first_frame)
+    assert checked_out == 0
+
+    kind, data = frame.strip().split("\n")
+    assert kind == "event: snapshot"
+    events = json.loads(data.removeprefix("data: "))["events"]
+    assert [e["event_type"] for e in events] == ["TRADE_EVALUATED", "TRADE_CREATED"]
+
+
+def test_updates_while_the_snapshot_is_read_are_kept_once(client, monkeypatch) -> None:
+    client.post("/trades/", json={"book": "RATES", "symbol": "UKT5Y", "quantity": 1, "price": 100})
+    read_snapshot = live_api._snapshot
+
+    async def racing_snapshot() -> dict:
+        # already in the cache when the snapshot reads it: skipped
+        publish_trade_updates([{"event_type": "COVERED"}], ["RATES"])
+        snapshot = await read_snapshot()
+        # booked after the snapshot was read: delivered
+        POSITIONS.apply("RATES", 1, calculate_bond_dv01("UKT5Y", 1, 100.0))
+        publish_trade_updates([{"event_type": "AFTER"}], ["RATES"])
+        return snapshot
+
+    monkeypatch.setattr(live_api, "_snapshot", racing_snapshot)
+
+    async def frames() -> tuple[str, str]:
+        response = await live_stream()
+        try:
+            return await anext(response.body_iterator), await anext(response.body_iterator)
+        finally:
+            await response.body_iterator.aclose()
+
+    snapshot, update = client.portal.call(frames)
+    (seen,) = [b["version"] for b in _data(snapshot)["books"] if b["book"] == "RATES"]
+    assert update.startswith("event: update")
+    assert [e["event_type"] for e in _data(update)["events"]] == ["AFTER"]
+    assert _data(update)["books"][0]["version"] == seen + 1
@@ -0,0 +1,41 @@
+from infra.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = Registry()
+    hist = registry.register(Histogram("stage_seconds", "Stage time", ("stage",), (0.01, 0.1)))
+    counter = registry.register(Counter("decisions_total", "Decisions", ("status",)))
+
+    for value in (0.005, 0.05, 0.5):
+        hist.observe(value, "limits")
+    counter.inc("PASS")
+    counter.inc("PASS")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="limits",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="limits",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="limits",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="limits"} 3' in text
+    assert 'decisions_total{status="PASS"} 2' in text
+    assert "# TYPE stage_seconds histogram" in text
+
+
+def test_request_latency_is_labelled_by_route_template(client) -> None:
+    from infra.metrics import HTTP_REQUEST_SECONDS
+
+    trade = {"book": "RATES", "symbol": "UKT5Y", "quantity": 1, "price": 100.0}
+    client.post("/trades/", json=trade)
+    client.get("/api/summary")
+    client.get("/risk/summary")
+    client.get("/risk-runs/missing")
+    client.get("/no-such-page")
+
+    for labels in (
+        ("POST", "/trades/", "200"),
+        ("GET", "/api/summary", "200"),
+        ("GET", "/risk/summary", "200"),
+        ("GET", "/risk-runs/{run_id}", "404"),
+        ("GET", "unmatched", "404"),
+    ):
+        assert HTTP_REQUEST_SECONDS.count(*labels) >= 1, labels
+    assert HTTP_REQUEST_SECONDS.count("GET", "/risk-runs/missing", "404") == 0
@@ -0,0 +1,66 @@
+import json
+
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from infra.db.migrate import upgrade_schema
+from infra.db.models import Base, Event, Instrument
+
+# the first release's schema (plus the instruments table before bond terms)
+OLD_SCHEMA = [
+    """CREATE TABLE trades (id VARCHAR PRIMARY KEY, symbol VARCHAR NOT NULL,
+        quantity FLOAT NOT NULL, price FLOAT NOT NULL, book VARCHAR NOT NULL,
+        created_at DATETIME NOT NULL)""",
+    """CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, event_type VARCHAR NOT NULL,
+        payload TEXT NOT NULL, created_at DATETIME NOT NULL)""",
+    """CREATE TABLE risk_runs (id VARCHAR PRIMARY KEY, book VARCHAR NOT NULL,
+        report TEXT NOT NULL, created_at DATETIME NOT NULL)""",
+    """CREATE TABLE instruments (symbol VARCHAR PRIMARY KEY, modified_duration FLOAT NOT NULL,
+        updated_at DATETIME NOT NULL)""",
+]
+
+
+def test_upgrade_adds_columns_and_backfills_events() -> None:
+    engine = create_engine("sqlite://")
+    evaluated = {
+        "trade": {"symbol": "UKT10Y", "quantity": 1e9, "price": 99.0, "book": "RATES"},
+        "trade_notional": 990_000_000.0,
+        "trade_dv01": 841_500.0,
+        "decision": {"status": "BLOCK", "reasons": ["LIM_TRADE_NOTIONAL_EXCEEDED"]},
+    }
+    created = {"symbol": "UKT5Y", "quantity": 1e5, "price": 101.0, "book": "CREDIT"}
+    with engine.begin() as conn:
+        for ddl in OLD_SCHEMA:
+            conn.execute(text(ddl))
+        for event_type, payload in (("TRADE_EVALUATED", evaluated), ("TRADE_CREATED", created)):
+            conn.execute(
+                text("INSERT INTO events (event_type, payload, created_at) VALUES (:t, :p, :c)"),
+                {"t": event_type, "p": json.dumps(payload), "c": "2024-01-02 09:00:00"},
+            )
+        conn.execute(
+            text("INSERT INTO instruments VALUES ('UKT10Y', 8.5, '2024-01-01 00:00:00')")
+        )
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # second run is a no-op
+
+    schema = inspect(engine)
+    for table in ("events", "risk_runs", "instruments", "trades"):
+        assert {c["name"] for c in schema.get_columns(table)} == {
+            c.name for c in Base.metadata.tables[table].columns
+        }
+        assert {i.name for i in Base.metadata.tables[table].indexes} <= {
+            i["name"] for i in schema.get_indexes(table)
+        }
+
+    with Session(engine) as db:
+        blocked, booked = db.scalars(select(Event).order_by(Event.id)).all()
+        assert blocked.payload == evaluated
+        assert (blocked.book, blocked.symbol) == ("RATES", "UKT10Y")
+        assert blocked.decision_status == "BLOCK"
+        assert blocked.reason_codes == ["LIM_TRADE_NOTIONAL_EXCEEDED"]
+        assert (blocked.trade_dv01, blocked.notional) == (841_500.0, 990_000_000.0)
+        assert (booked.book, booked.symbol, booked.decision_status) == ("CREDIT", "UKT5Y", None)
+
+        assert db.get(Instrument, "UKT10Y").frequency == 2
@@ -0,0 +1,181 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.risk.dv01 import calculate_bond_dv01
+from core.risk.positions import BookPositionStore
+from core.risk import bond
+from core.risk.reference import (
+    REFERENCE,
+    SEED_CURVE,
+    SEED_DURATIONS,
+    SEED_TERMS,
+    ReferenceStore,
+    build_index,
+)
+from infra.db.models import Base, Trade
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_position_store_tracks_applied_trades() -> None:
+    db = _session()
+    db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=99.25, book="RATES"))
+    db.commit()
+
+    store = BookPositionStore()
+    store.warm(db)
+
+    risk = calculate_bond_dv01("UKT5Y", 500_000, 101.0)
+    db.add(Trade(symbol="UKT5Y", quantity=500_000, price=101.0, book="RATES"))
+    db.commit()
+    store.apply("RATES", 500_000, risk)
+
+    check = store.verify(db, "RATES")
+    assert check["consistent"]
+    assert store.book_dv01(db, "RATES") == check["cached_dv01"]
+
+
+def test_position_store_repairs_stale_book() -> None:
+    db = _session()
+    store = BookPositionStore()
+    assert store.book_dv01(db, "RATES") == 0.0
+
+    # booked by another writer, never applied to this store
+    db.add(Trade(symbol="UKT30Y", quantity=1_000_000, price=100.0, book="RATES"))
+    db.commit()
+
+    check = store.verify(db, "RATES", repair=True)
+    assert not check["consistent"]
+    assert store.verify(db, "RATES")["consistent"]
+
+
+def test_position_store_reprices_on_reference_swap() -> None:
+    db = _session()
+    db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=100.0, book="RATES"))
+    db.commit()
+
+    store = BookPositionStore()
+    store.warm(db)
+    before = store.book_dv01(db, "RATES")
+
+    durations = dict(REFERENCE.current.durations, UKT10Y=17.0)
+    store.reprice(build_index(REFERENCE.current.version + 1, list(durations.items())))
+
+    assert store.book_dv01(db, "RATES") == before * 2
+    assert store.snapshot("RATES")["reference_version"] == REFERENCE.current.version + 1
+
+
+def test_reloading_an_unchanged_book_keeps_its_version() -> None:
+    db = _session()
+    db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=100.0, book="RATES"))
+    db.commit()
+
+    store = BookPositionStore()
+    store.load_book(db, "RATES")
+    version = store.version("RATES")
+    store.load_book(db, "RATES")
+    store.load_book(db, "EMPTY")
+    assert store.version("RATES") == version
+    assert store.version("EMPTY") == 0
+
+    db.add(Trade(symbol="UKT5Y", quantity=1_000_000, price=100.0, book="RATES"))
+    db.commit()
+    store.load_book(db, "RATES")
+    assert store.version("RATES") == version + 1
+
+
+def test_what_if_reads_uncached_books_without_caching_them(client) -> None:
+    from core.risk.positions import POSITIONS
+    from infra.db.session import SessionLocal
+
+    # booked by another writer: in the DB, not in this worker's cache
+    with SessionLocal() as db:
+        db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=100.0, book="OTHER"))
+        db.commit()
+        expected = BookPositionStore().book_dv01(db, "OTHER")
+    assert expected != 0.0
+
+    books, versions = POSITIONS.books(), POSITIONS.versions()
+    candidates = [
+        {"book": book, "symbol": "UKT5Y", "quantity": 100_000, "price": 100.0}
+        for book in ("OTHER", *(f"HYPO{i}" for i in range(50)))
+    ]
+    response = client.post("/trades/what-if", json={"trades": candidates})
+    assert response.status_code == 200
+
+    book_dv01 = response.json()["book_dv01"]
+    assert book_dv01["OTHER"] == expected
+    assert book_dv01["HYPO0"] == 0.0
+    assert (POSITIONS.books(), POSITIONS.versions()) == (books, versions)
+
+
+def test_refresh_reloads_only_a_moved_book() -> None:
+    async def scenario() -> None:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as db:
+            db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=100.0, book="RATES"))
+            await db.commit()
+
+            store = BookPositionStore()
+            loaded = await store.refresh_book_async(db, "RATES")
+            version = store.version("RATES")
+
+            # same trade count: the cached book is kept as is
+            assert await store.refresh_book_async(db, "RATES") is loaded
+            assert store.version("RATES") == version
+
+            # booked by another worker
+            db.add(Trade(symbol="UKT10Y", quantity=500_000, price=100.0, book="RATES"))
+            await db.commit()
+            moved = await store.refresh_book_async(db, "RATES")
+            assert moved.trade_count == 2
+            assert moved.symbols["UKT10Y"].net_quantity == 1_500_000
+            assert store.version("RATES") == version + 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_positions_are_repriced_when_the_valuation_date_rolls(monkeypatch) -> None:
+    monkeypatch.setitem(bond.BOOK_PRICING, "CURVE", "curve")
+    rows = [
+        (s, d, SEED_TERMS[s].coupon, SEED_TERMS[s].maturity, SEED_TERMS[s].frequency)
+        for s, d in SEED_DURATIONS.items()
+    ]
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    stale = replace(build_index(1, rows, list(SEED_CURVE.items())), valuation_date=yesterday)
+
+    db = _session()
+    db.add(Trade(symbol="UKT10Y", quantity=1_000_000, price=100.0, book="CURVE"))
+    db.commit()
+    store = BookPositionStore()
+    store.reprice(stale)
+    store.load_book(db, "CURVE")
+    priced_yesterday = store.book_dv01(db, "CURVE")
+    version = store.version("CURVE")
+
+    reference = ReferenceStore(stale)
+    reference.on_swap(store.reprice)
+    today = reference.current
+    assert (today.version, today.valuation_date) == (1, yesterday + timedelta(days=1))
+    assert reference.current is today
+
+    expected = calculate_bond_dv01("UKT10Y", 1_000_000, 100.0, today, book="CURVE").dv01
+    assert expected != priced_yesterday
+    assert store.book_dv01(db, "CURVE") == expected
+    assert store.version("CURVE") == version + 1
+
+    # priced on the old date just before the roll, booked at today's
+    store.apply("CURVE", 1_000_000, calculate_bond_dv01("UKT10Y", 1_000_000, 100.0, stale, "CURVE"))
+    assert store.book_dv01(db, "CURVE") == 2 * expected
@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+
+import pytest
+
+from infra.db.models import Trade
+from infra.db.session import SessionLocal
+
+TRADES = [
+    {"book": "RATES", "symbol": "UKT10Y", "quantity": 1_000_000, "price": 99.0},
+    {"book": "RATES", "symbol": "UKT5Y", "quantity": -400_000, "price": 101.0},
+]
+
+
+def _book(client) -> None:
+    for trade in TRADES:
+        client.post("/trades/", json=trade)
+    # booked before its instrument was removed from the reference: cannot be priced
+    with SessionLocal() as db:
+        db.add(Trade(book="RATES", symbol="OLDGILT", quantity=100_000, price=100.0))
+        db.commit()
+
+
+def test_ndjson_export_reports_unpriced_trades(client) -> None:
+    _book(client)
+    lines = [json.loads(x) for x in client.get("/api/report/stream").text.splitlines()]
+
+    trades = [x for x in lines if x["type"] == "trade"]
+    (error,) = [x for x in lines if x["type"] == "error"]
+    totals = lines[-1]
+
+    assert error["symbol"] == "OLDGILT" and "OLDGILT" in error["error"]
+    assert (totals["type"], totals["trade_count"], totals["error_count"]) == ("totals", 2, 1)
+    assert totals["portfolio_dv01"] == pytest.approx(sum(t["dv01"] for t in trades))
+
+
+def test_csv_export_has_the_same_totals_and_errors(client) -> None:
+    _book(client)
+    ndjson = [json.loads(x) for x in client.get("/api/report/stream").text.splitlines()]
+    totals = ndjson[-1]
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/api/report/stream?format=csv").text)))
+    *trades, total = rows
+
+    (failed,) = [r for r in trades if r["error"]]
+    assert (failed["symbol"], failed["dv01"]) == ("OLDGILT", "")
+    assert total["trade_id"] == "TOTAL"
+    assert int(total["trade_count"]) == totals["trade_count"] == 2
+    assert int(total["error_count"]) == totals["error_count"] == 1
+    assert int(total["reference_version"]) == totals["reference_version"]
+    assert float(total["dv01"]) == pytest.approx(totals["portfolio_dv01"])
+    assert float(total["notional"]) == pytest.approx(totals["portfolio_notional"])
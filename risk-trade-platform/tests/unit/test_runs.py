@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from infra.db.models import Trade
+from infra.db.session import SessionLocal
+
+BOOK = "RUNS"
+
+
+def _trade(symbol: str, quantity: float) -> dict:
+    return {"book": BOOK, "symbol": symbol, "quantity": quantity, "price": 100.0}
+
+
+def _report(client, run_id: str) -> dict:
+    report = client.get(f"/risk-runs/{run_id}").json()
+    return {k: report[k] for k in ("trade_count", "risk")}
+
+
+def test_delta_run_matches_full_run_with_late_trade(client) -> None:
+    for symbol in ("UKT5Y", "UKT10Y", "UKT30Y"):
+        assert client.post("/trades/", json=_trade(symbol, 100_000)).status_code == 200
+    first = client.post("/risk-runs", params={"book": BOOK}).json()
+    mark = datetime.fromisoformat(first["high_water_mark"])
+
+    # committed after the run but stamped before its high-water mark, as a slow
+    # commit on another worker would be
+    with SessionLocal() as db:
+        late = Trade(**_trade("UKT10Y", 200_000), created_at=mark - timedelta(seconds=1))
+        db.add(late)
+        db.commit()
+    assert client.post("/trades/", json=_trade("UKT5Y", -50_000)).status_code == 200
+
+    delta = client.post("/risk-runs", params={"book": BOOK}).json()
+    assert delta["base_run_id"] == first["run_id"]
+    full = client.post("/risk-runs", params={"book": BOOK, "full": "true"}).json()
+    assert full["base_run_id"] is None
+
+    assert _report(client, delta["run_id"]) == _report(client, full["run_id"])
+    assert _report(client, full["run_id"])["trade_count"] == 5
+
+    # the next delta does not count the late trade (or any other) twice
+    again = client.post("/risk-runs", params={"book": BOOK}).json()
+    assert _report(client, again["run_id"]) == _report(client, full["run_id"])
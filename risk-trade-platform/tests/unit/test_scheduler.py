@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from core.risk import scheduler
+from core.risk.scheduler import RiskRunScheduler
+
+
+def test_full_request_during_a_delta_queues_a_full_run(monkeypatch) -> None:
+    started: list[bool] = []
+    release = asyncio.Event()
+
+    async def fake_run(db, book: str, full: bool = False):
+        started.append(full)
+        await release.wait()
+        return SimpleNamespace(id=f"run-{len(started)}")
+
+    monkeypatch.setattr(scheduler, "create_risk_run", fake_run)
+
+    async def scenario() -> None:
+        s = RiskRunScheduler(schedule={}, leader="off")
+        delta = s.submit("RATES")
+        await asyncio.sleep(0)
+
+        # a second delta shares the active job; a full one queues behind it
+        assert s.submit("RATES") is delta
+        full = s.submit("RATES", full=True)
+        assert full is not delta and full.full and full.status == "QUEUED"
+        assert s.submit("RATES", full=True) is full
+
+        release.set()
+        while full.status != "DONE":
+            await asyncio.sleep(0.01)
+        assert delta.status == "DONE"
+        assert started == [False, True]
+        await s.stop()
+
+    asyncio.run(scenario())
+
+
+def test_schedule_runs_only_on_the_leader(monkeypatch) -> None:
+    submitted: list[tuple[str, bool]] = []
+
+    async def scenario(leader: str) -> None:
+        s = RiskRunScheduler(schedule={"RATES": 0.01}, full_every=3, leader=leader)
+        monkeypatch.setattr(s, "submit", lambda book, full, trigger: submitted.append((book, full)))
+        s.start()
+        await asyncio.sleep(0.1)
+        await s.stop()
+
+    asyncio.run(scenario("off"))
+    assert submitted == []
+
+    asyncio.run(scenario("on"))
+    assert len(submitted) >= 3
+    assert [full for _, full in submitted[:3]] == [False, False, True]
@@ -0,0 +1,48 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.controls.sequencer import SEQUENCER
+from core.risk.dv01 import calculate_bond_dv01
+
+BOOK = "SEQ"
+TRADE = {"book": BOOK, "symbol": "UKT10Y", "quantity": 100_000, "price": 100.0}
+
+
+def test_parallel_trades_for_one_book_are_checked_in_turn(client) -> None:
+    n = 10
+    dv01 = calculate_bond_dv01(TRADE["symbol"], TRADE["quantity"], TRADE["price"]).dv01
+
+    # room for n - 1 trades: only the last one to be checked can breach
+    limit = {"level": "BOOK", "book": BOOK, "metric": "book_dv01", "block": (n - 0.5) * dv01}
+    assert client.put("/api/limits", json={"rules": [limit]}).status_code == 200
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        responses = list(pool.map(lambda _: client.post("/trades/", json=TRADE), range(n)))
+
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200] * (n - 1) + [409]
+
+    # cached book DV01 agrees with a recompute from the trades table
+    check = client.post("/risk/positions/verify", params={"book": BOOK}).json()
+    assert check["consistent"]
+    assert check["recomputed_dv01"] == pytest.approx((n - 1) * dv01)
+
+
+def test_repair_waits_for_the_book_lock(client) -> None:
+    # a fresh book: asyncio locks stay bound to the loop of an earlier test client
+    book = "SEQ-REPAIR"
+    assert client.post("/trades/", json={**TRADE, "book": book}).status_code == 200
+
+    # a trade holding the lock may be committed but not yet applied
+    lock = SEQUENCER._lock(book)
+    client.portal.call(lock.acquire)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        params = {"book": book, "repair": "true"}
+        pending = pool.submit(client.post, "/risk/positions/verify", params=params)
+        time.sleep(0.2)
+        assert not pending.done()
+        client.portal.call(lock.release)
+        check = pending.result(timeout=5).json()
+    assert check["consistent"] and not check["repaired"]
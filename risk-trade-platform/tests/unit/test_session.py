@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from infra.db.session import (
+    InstrumentedAsyncQueuePool,
+    PoolStats,
+    async_engine,
+    get_async_db,
+    pool_status,
+)
+
+
+def test_async_dependency_returns_its_connection_on_error() -> None:
+    async def scenario() -> None:
+        dependency = get_async_db()
+        db = await anext(dependency)
+        await db.execute(text("SELECT 1"))
+        assert pool_status()["async"]["checked_out"] == 1
+
+        # the route raised: FastAPI throws the error into the dependency
+        with pytest.raises(RuntimeError):
+            await dependency.athrow(RuntimeError("route failed"))
+        assert pool_status()["async"]["checked_out"] == 0
+        # pooled connections belong to this event loop
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_async_pool_times_checkouts(tmp_path) -> None:
+    class Pool(InstrumentedAsyncQueuePool):
+        stats = PoolStats()
+
+    async def scenario() -> None:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=Pool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            # the only connection is checked out: the next caller queues, then gives up
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    stats = Pool.stats.as_dict()
+    assert (stats["checkouts"], stats["timeouts"]) == (2, 1)
+    assert stats["wait_max_ms"] < 100
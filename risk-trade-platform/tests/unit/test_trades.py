@@ -0,0 +1,33 @@
+import json
+
+from sqlalchemy import func, select
+
+from apps.api.routes import trades
+from core.risk.positions import POSITIONS
+from infra.db.models import Event, IdempotencyRecord, Trade
+from infra.db.session import SessionLocal
+
+BOOK = "ATOMIC"
+
+
+def test_rolled_back_trade_leaves_no_audit_rows(client, monkeypatch) -> None:
+    # another worker committed this key after our lookup missed it, so our
+    # commit hits the primary key and the whole transaction rolls back
+    winner = {"status": "PASS", "trade_id": "from-the-other-worker"}
+    with SessionLocal() as db:
+        db.add(IdempotencyRecord(key="race", response=json.dumps(winner)))
+        db.commit()
+
+    async def missed(db, key):
+        return None
+
+    monkeypatch.setattr(trades, "lookup_response", missed)
+    trade = {"book": BOOK, "symbol": "UKT10Y", "quantity": 100_000, "price": 100.0}
+    response = client.post("/trades/", json=trade, headers={"Idempotency-Key": "race"})
+    assert response.json() == winner
+
+    # neither the trade nor its TRADE_EVALUATED / TRADE_CREATED events survive
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count(Trade.id)).where(Trade.book == BOOK)) == 0
+        assert db.scalar(select(func.count(Event.id)).where(Event.book == BOOK)) == 0
+    assert POSITIONS.snapshot(BOOK)["trade_count"] == 0